@@ -0,0 +1,943 @@
+import heapq
+import os
+import re
+import sqlite3
+from bisect import bisect_left, bisect_right
+from contextlib import contextmanager
+from itertools import islice
+import perf
+import serializer
+from models import Student, dept_name
+from ngram import match_rank
+from recordfile import open_record_file, write_record_file
+from serializer import DEFAULT_FORMAT, FORMATS
+from storage import Journal, PartialSnapshotError, StoreLock, file_identity, read_snapshot, warn, write_snapshot
+
+COMPACT_THRESHOLD = 1024 * 1024  # journal bytes before folding it into the snapshot
+BATCH_JOURNAL_LIMIT = 1000  # students changed by a transaction that is still journaled rather than saved whole
+
+
+# Interface every storage backend implements. The lookups here are plain scans;
+# backends that can answer them from an index override them.
+class StorageBackend:
+    # Whether StudentManager should hold the whole roster in memory by default
+    preload = True
+    # roll_order()'s cached result and the state() it was read at
+    ordered = None
+    ordered_state = None
+
+    # The roster the manager will hold and mutate; mutations are persisted against it
+    def load(self):
+        raise NotImplementedError
+
+    # Read every record without handing ownership to the caller
+    def scan(self):
+        return self.load()
+
+    def get(self, roll):
+        for s in self.scan():
+            if s.student_roll == roll:
+                return s
+        return None
+
+    def get_by_email(self, email):
+        email = email.lower()
+        for s in self.scan():
+            if s.email.lower() == email:
+                return s
+        return None
+
+    def search_name(self, text):
+        text = text.lower()
+        matches = [s for s in self.scan() if text in s.name.lower()]
+        return sorted(matches, key=lambda s: (match_rank(s.name.lower(), text), s.student_roll))
+
+    # The roster sorted by roll is kept between calls while state() is unchanged,
+    # so paging through it sorts once rather than once per page
+    def list_range(self, low=None, high=None, offset=0, limit=None):
+        with self.lock(exclusive=False):
+            ordered, rolls = self.roll_order()
+            start = 0 if low is None else bisect_left(rolls, low)
+            end = len(rolls) if high is None else bisect_right(rolls, high)
+            start = min(start + offset, end)
+            if limit is not None:
+                end = min(end, start + limit)
+            return ordered[start:end]
+
+    def count_range(self, low=None, high=None):
+        with self.lock(exclusive=False):
+            rolls = self.roll_order()[1]
+            start = 0 if low is None else bisect_left(rolls, low)
+            end = len(rolls) if high is None else bisect_right(rolls, high)
+            return max(end - start, 0)
+
+    # (students, their rolls), both in roll order
+    def roll_order(self):
+        state = self.state()
+        if state is None or state != self.ordered_state:
+            ordered = sorted(self.scan(), key=lambda s: s.student_roll)
+            self.ordered = (ordered, [s.student_roll for s in ordered])
+            self.ordered_state = state
+        return self.ordered
+
+    # Changes whenever the stored roster does, so what was read from it can be
+    # reused until then; None if the backend can't tell, and nothing is reused
+    def state(self):
+        return None
+
+    def insert(self, student):
+        raise NotImplementedError
+
+    def insert_many(self, students):
+        for s in students:
+            self.insert(s)
+
+    def update(self, student):
+        raise NotImplementedError
+
+    def delete(self, student):
+        raise NotImplementedError
+
+    def save_all(self, students):
+        raise NotImplementedError
+
+    # Persist a transaction's changes, {roll: Student, or None to delete}, as one
+    # commit. This fallback writes them one at a time; the stores override it.
+    def apply_changes(self, changes):
+        for roll, s in changes.items():
+            current = self.get(roll)
+            if s is None:
+                if current is not None:
+                    self.delete(current)
+            elif current is None:
+                self.insert(s)
+            else:
+                self.update(s)
+
+    # Held around every mutation (exclusive) and read (shared) when other
+    # processes may use the same store; nests within one process
+    @contextmanager
+    def lock(self, exclusive=True):
+        yield
+
+    # Make every change so far durable
+    def sync(self):
+        pass
+
+    # Records other processes changed since this one loaded the roster,
+    # as {roll: Student, or None if deleted}
+    def changes(self):
+        return {}
+
+    def close(self):
+        pass
+
+
+# students_db.json snapshot plus an optional append-only journal. Several
+# processes can share it: writes take students_db.json.lock, and a loaded
+# process catches up on what others wrote through changes().
+class JsonBackend(StorageBackend):
+    def __init__(self, filename="students_db.json", journaled=True, compact_threshold=COMPACT_THRESHOLD, snapshot_format=DEFAULT_FORMAT):
+        if snapshot_format not in FORMATS:
+            raise ValueError(f"Unknown snapshot format {snapshot_format!r}; use one of {', '.join(FORMATS)}")
+        self.filename = filename
+        self.snapshot_format = snapshot_format
+        self.journal = Journal(filename + ".log") if journaled else None
+        self.compact_threshold = compact_threshold
+        self.store_lock = StoreLock(filename + ".lock")
+        # The list handed out by load(); the manager mutates it and snapshots are written from it
+        self.students = []
+        self.loaded = False
+        # How far the loaded roster has read: store version, snapshot file and journal bytes
+        self.version = None
+        self.identity = None
+        self.offset = 0
+
+    def lock(self, exclusive=True):
+        return self.store_lock(exclusive)
+
+    def load(self):
+        with self.lock(exclusive=False):
+            self.students = list(self.scan())
+            self.identity, self.offset = self.last_read
+            self.version = self.store_lock.version()
+        self.loaded = True
+        return self.students
+
+    # Stream the roster one Student at a time: snapshot records first, with the
+    # journal's final state for each roll it touched applied on top
+    def scan(self):
+        with self.lock(exclusive=False):
+            identity = file_identity(self.filename)
+            changes, offset = self.journal_changes()
+            self.last_read = (identity, offset)
+            scanned = 0
+            skip = 0
+            yielded = set()  # rolls already handed out, in case a generation fails part way
+            try:
+                while True:
+                    try:
+                        for record in read_snapshot(self.filename, skip=skip):
+                            scanned += 1
+                            if record["roll"] not in changes and record["roll"] not in yielded:
+                                yielded.add(record["roll"])
+                                yield Student.from_dict(record)
+                        break
+                    except PartialSnapshotError as e:
+                        skip = e.skip  # carry on from the next generation
+                for record in changes.values():
+                    if record is not None:
+                        yield Student.from_dict(record)
+            finally:
+                if perf.enabled:
+                    perf.count("records_scanned", scanned)
+
+    # The final record (None once deleted) for each roll the journal touches
+    # from byte offset on, and the offset just past the last entry read
+    def journal_changes(self, offset=0):
+        changes = {}
+        if self.journal is None:
+            return changes, 0
+        for entry in self.journal.replay(offset):
+            if entry["op"] == "delete":
+                changes[entry["roll"]] = None
+            elif entry["op"] == "batch":
+                changes.update(dict.fromkeys(entry["deleted"]))
+                changes.update((r["roll"], r) for r in entry["records"])
+            else:
+                changes[entry["record"]["roll"]] = entry["record"]
+        return changes, self.journal.end
+
+    # Every write bumps the store version; the snapshot's identity also covers
+    # one replaced by hand
+    def state(self):
+        return self.store_lock.version(), file_identity(self.filename)
+
+    def changes(self):
+        if not self.loaded:
+            return {}
+        with self.lock(exclusive=False):
+            version = self.store_lock.version()
+            if version == self.version:
+                return {}
+            if file_identity(self.filename) == self.identity:
+                # Only the journal grew: read just the new entries
+                records, self.offset = self.journal_changes(self.offset)
+                changed = {roll: Student.from_dict(r) if r is not None else None for roll, r in records.items()}
+            else:
+                # Another process rewrote the snapshot; compare it record by record
+                fresh = {s.student_roll: s for s in self.scan()}
+                self.identity, self.offset = self.last_read
+                current = {s.student_roll: s for s in self.students}
+                changed = {roll: s for roll, s in fresh.items() if roll not in current or current[roll].to_dict() != s.to_dict()}
+                changed.update((roll, None) for roll in current if roll not in fresh)
+            self.version = version
+        return changed
+
+    # After this process writes: bump the store version and count its own write as read.
+    # The loaded roster was brought up to date (changes()) before the write.
+    def wrote(self):
+        self.version = self.store_lock.bump()
+        if self.loaded:
+            self.identity = file_identity(self.filename)
+            self.offset = self.journal.size if self.journal is not None else 0
+
+    def insert(self, student):
+        self.record_change("add", student)
+
+    # A batch is committed with one snapshot write, which also folds in the journal
+    def insert_many(self, students):
+        with self.lock():
+            if self.loaded:
+                roster = self.students
+            else:
+                roster = list(self.scan())
+                roster.extend(students)
+            if self.write(roster) and self.journal is not None:
+                self.journal.reset()
+            self.wrote()
+
+    def update(self, student):
+        self.record_change("update", student)
+
+    def delete(self, student):
+        self.record_change("delete", student)
+
+    # Persist a single mutation: one journal line, or a full save without a journal
+    def record_change(self, op, student):
+        with self.lock():
+            if self.journal is None:
+                students = self.students
+                if not self.loaded:
+                    # The manager isn't holding the roster, so apply the change to a streamed copy
+                    students = [s for s in self.scan() if s.student_roll != student.student_roll]
+                    if op != "delete":
+                        students.append(student)
+                self.write(students)
+                self.wrote()
+                return
+            if op == "delete":
+                self.journal.append(op, roll=student.student_roll)
+            else:
+                self.journal.append(op, record=student.to_dict())
+            self.wrote()
+            if self.journal.size >= self.compact_threshold:
+                self.compact()
+
+    # A small transaction is one journal entry, synced before returning; a torn
+    # entry is dropped whole on replay, so a crash keeps all of it or none.
+    # A large one (or any without a journal) is one snapshot write instead.
+    def apply_changes(self, changes):
+        with self.lock():
+            if self.journal is not None and len(changes) <= BATCH_JOURNAL_LIMIT:
+                records = [s.to_dict() for s in changes.values() if s is not None]
+                deleted = [roll for roll, s in changes.items() if s is None]
+                self.journal.append("batch", records=records, deleted=deleted)
+                self.journal.sync()
+                self.wrote()
+                if self.journal.size >= self.compact_threshold:
+                    self.compact()
+                return
+            if self.loaded:
+                students = self.students  # the manager already applied the changes to it
+            else:
+                students = [s for s in self.scan() if s.student_roll not in changes]
+                students.extend(s for s in changes.values() if s is not None)
+            if not self.write(students):
+                raise IOError(f"Could not save {self.filename}")
+            if self.journal is not None:
+                self.journal.reset()
+            self.wrote()
+
+    def sync(self):
+        if self.journal is not None:
+            self.journal.sync()
+
+    def save_all(self, students):
+        with self.lock():
+            saved = self.write(students)
+            self.wrote()
+        return saved
+
+    def write(self, students):
+        try:
+            write_snapshot(self.filename, students, fmt=self.snapshot_format)
+            return True
+        except IOError as e:
+            print(f"Error saving data: {e}")
+            return False
+
+    # Fold the journal back into the snapshot
+    def compact(self):
+        if self.journal is None:
+            return
+        with self.lock():
+            self.journal.sync()
+            # Without a held roster, stream the snapshot plus journal straight into the new one
+            students = self.students if self.loaded else list(self.scan())
+            if self.write(students):
+                self.journal.reset()
+            self.wrote()
+
+    def close(self):
+        # A session that never loaded the roster leaves the journal for the next full load
+        if self.journal is not None and self.loaded and self.journal.size:
+            self.compact()
+        elif self.journal is not None:
+            self.journal.close()
+        self.store_lock.close()
+
+
+# Binary record file (see recordfile.py) mapped into memory: a roll lookup is a
+# binary search of its roll directory plus one record decode, so answering it
+# doesn't parse the roster. Changes go to a journal and lock exactly as for the
+# JSON store, and compaction folds them into a freshly written file.
+class BinaryBackend(JsonBackend):
+    preload = False
+
+    def __init__(self, filename="students.bin", compact_threshold=COMPACT_THRESHOLD):
+        super().__init__(filename, compact_threshold=compact_threshold)
+        self.records = None  # the mapped RecordFile
+        self.mapped = None  # file_identity of what is mapped
+        # Journal entries read so far (roll -> record, None once deleted), as of store version overlay_version
+        self.overlay = {}
+        self.overlay_version = None
+        self.overlay_offset = 0
+
+    # Remap the file and read new journal entries if anyone wrote since last time.
+    # Called with the store lock held.
+    def catch_up(self):
+        version = self.store_lock.version()
+        if version == self.overlay_version:
+            return
+        identity = file_identity(self.filename)
+        if identity != self.mapped:
+            if self.records is not None:
+                self.records.close()
+            self.records = open_record_file(self.filename)
+            self.mapped = identity
+            self.overlay, self.overlay_offset = {}, 0
+        changes, self.overlay_offset = self.journal_changes(self.overlay_offset)
+        self.overlay.update(changes)
+        self.overlay_version = version
+
+    def scan(self):
+        with self.lock(exclusive=False):
+            self.catch_up()
+            self.last_read = (self.mapped, self.overlay_offset)
+            overlay = dict(self.overlay)
+            scanned = 0
+            try:
+                if self.records is not None:
+                    for s in self.records.students(overlay):
+                        scanned += 1
+                        yield s
+                for record in overlay.values():
+                    if record is not None:
+                        yield Student.from_dict(record)
+            finally:
+                if perf.enabled:
+                    perf.count("records_scanned", scanned)
+
+    def get(self, roll):
+        with self.lock(exclusive=False):
+            self.catch_up()
+            if roll in self.overlay:
+                record = self.overlay[roll]
+                return Student.from_dict(record) if record is not None else None
+            return self.records.find(roll) if self.records is not None else None
+
+    def get_by_email(self, email):
+        email = email.lower()
+        with self.lock(exclusive=False):
+            self.catch_up()
+            for record in self.overlay.values():
+                if record is not None and record["email"].lower() == email:
+                    return Student.from_dict(record)
+            if self.records is not None:
+                for s in self.records.find_email(email):
+                    if s.student_roll not in self.overlay:
+                        return s
+            return None
+
+    # Rolls come from the directory (and the journal) in order, so only the
+    # students on the requested page are decoded
+    def list_range(self, low=None, high=None, offset=0, limit=None):
+        with self.lock(exclusive=False):
+            self.catch_up()
+            overlay = self.overlay
+            changed = sorted(
+                (roll, record) for roll, record in overlay.items()
+                if record is not None and (low is None or roll >= low) and (high is None or roll <= high)
+            )
+            stored = ((roll, number) for roll, number in self.records.entries(low, high) if roll not in overlay) if self.records else ()
+            page = islice(heapq.merge(stored, changed, key=lambda item: item[0]), offset, None if limit is None else offset + limit)
+            return [self.records.record(found) if type(found) is int else Student.from_dict(found) for _, found in page]
+
+    def count_range(self, low=None, high=None):
+        with self.lock(exclusive=False):
+            self.catch_up()
+            in_range = [roll for roll in self.overlay if (low is None or roll >= low) and (high is None or roll <= high)]
+            count = sum(1 for roll in in_range if self.overlay[roll] is not None)
+            if self.records is not None:
+                start = self.records.bisect(low) if low is not None else 0
+                end = self.records.bisect(high + 1) if high is not None else len(self.records)
+                # Journal entries for rolls also in the file were counted above already
+                count += end - start - sum(1 for roll in in_range if self.records.locate(roll) is not None)
+            return count
+
+    def write(self, students):
+        try:
+            write_record_file(self.filename, students)
+            return True
+        except IOError as e:
+            print(f"Error saving data: {e}")
+            return False
+
+    def close(self):
+        super().close()
+        if self.records is not None:
+            self.records.close()
+            self.records = None
+
+
+# Worker for ShardedBackend: one shard's students as plain tuples (cheaper to
+# send back between processes than Student objects), and how far it was read
+# Runs in a pool worker. With counted, the perf counters bumped while reading
+# are sent back as well, for the parent to merge into its own.
+def load_shard(path, counted=False):
+    if counted:
+        perf.enabled = True
+        before = dict(perf.counters)
+    shard = JsonBackend(path)
+    try:
+        rows = [(s.name, s.student_roll, s.cgpa, s.email, s.dept, s.semester, s.phone) for s in shard.scan()]
+        counts = {name: n - before.get(name, 0) for name, n in perf.counters.items() if n != before.get(name, 0)} if counted else None
+        return rows, shard.last_read, counts
+    finally:
+        shard.close()
+
+
+# A directory of JSON stores ("shards"), with students partitioned by dept or
+# by roll range (ROLL_WIDTH rolls per shard); manifest.json records which.
+# Shards are read in parallel by a process pool, each mutation is journaled in
+# the one shard it touches, and compaction rewrites only that shard. Writers
+# hold the directory's store.lock, under which the manager checks rolls and
+# emails against every shard, so they stay unique across shards.
+class ShardedBackend(StorageBackend):
+    ROLL_WIDTH = 100000
+    PARTITIONS = ("dept", "roll")
+
+    def __init__(self, directory="students.shards", partition=None, workers=None, compact_threshold=COMPACT_THRESHOLD, snapshot_format=DEFAULT_FORMAT):
+        self.filename = directory
+        self.workers = workers or os.cpu_count() or 1
+        self.compact_threshold = compact_threshold
+        self.snapshot_format = snapshot_format
+        os.makedirs(directory, exist_ok=True)
+        manifest = os.path.join(directory, "manifest.json")
+        if os.path.exists(manifest):
+            with open(manifest) as file:
+                self.partition = serializer.loads(file.read())["partition"]
+            if partition is not None and partition != self.partition:
+                raise ValueError(f"{directory} is already sharded by {self.partition}")
+        else:
+            self.partition = partition or "dept"
+            if self.partition not in self.PARTITIONS:
+                raise ValueError(f"Shard by one of {', '.join(self.PARTITIONS)}, not {self.partition!r}")
+            with open(manifest, "w") as file:
+                file.write(serializer.dumps({"partition": self.partition, "roll_width": self.ROLL_WIDTH}) + "\n")
+        self.store_lock = StoreLock(os.path.join(directory, "store.lock"))
+        self.shards = {}  # shard name -> JsonBackend, opened on first use
+        self.students = []
+        self.loaded = False
+        # With the roster loaded: the shard each roll is in, the store version
+        # seen, and per shard the (file identity, journal offset) read up to
+        self.location = {}
+        self.version = None
+        self.seen = {}
+
+    def lock(self, exclusive=True):
+        return self.store_lock(exclusive)
+
+    def shard_name(self, student):
+        if self.partition == "roll":
+            return f"roll-{student.student_roll // self.ROLL_WIDTH * self.ROLL_WIDTH:06d}"
+        return "dept-" + re.sub(r"[^\w-]", "_", student.dept)
+
+    def shard(self, name):
+        if name not in self.shards:
+            path = os.path.join(self.filename, name + ".json")
+            self.shards[name] = JsonBackend(path, compact_threshold=self.compact_threshold, snapshot_format=self.snapshot_format)
+        return self.shards[name]
+
+    # Every shard on disk, including one that so far only has a journal
+    def shard_names(self):
+        names = set()
+        for entry in os.listdir(self.filename):
+            for suffix in (".json", ".json.log"):
+                if entry.endswith(suffix) and entry != "manifest.json":
+                    names.add(entry[:-len(suffix)])
+        return sorted(names)
+
+    # (name, students, last_read) per shard, read by the process pool when
+    # there are several shards and cores to spread them over
+    def read_shards(self, names):
+        paths = [os.path.join(self.filename, name + ".json") for name in names]
+        if self.workers > 1 and len(paths) > 1:
+            from concurrent.futures import ProcessPoolExecutor  # loads multiprocessing; kept off CLI startup
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(paths))) as pool:
+                for name, (rows, last_read, counts) in zip(names, pool.map(load_shard, paths, [perf.enabled] * len(paths))):
+                    if counts:
+                        perf.merge(counts)
+                    yield name, [Student(*row) for row in rows], last_read
+        else:
+            for name, path in zip(names, paths):
+                shard = JsonBackend(path)
+                yield name, list(shard.scan()), shard.last_read
+                shard.close()
+
+    def load(self):
+        stale = []
+        with self.lock(exclusive=False):
+            names = self.shard_names()
+            modified = {name: self.modified(name) for name in names}
+            owner = {}
+            students = {}
+            for name, shard_students, last_read in self.read_shards(names):
+                self.seen[name] = last_read
+                found = {s.student_roll: s for s in shard_students}
+                for roll in found.keys() & students.keys():
+                    # Left in two shards by a crash while moving it; the shard written last has the current copy
+                    warn(f"student {roll} is in shards {owner[roll]} and {name}; keeping the newer copy.")
+                    if modified[name] <= modified[owner[roll]]:
+                        stale.append((name, found.pop(roll)))
+                    else:
+                        stale.append((owner[roll], students[roll]))
+                students.update(found)
+                owner.update(dict.fromkeys(found, name))
+            self.version = self.store_lock.version()
+        self.students = list(students.values())
+        self.location = owner
+        self.loaded = True
+        if stale:
+            with self.lock():
+                for name, s in stale:
+                    self.shard(name).delete(s)
+                self.wrote()
+        return self.students
+
+    def modified(self, name):
+        path = os.path.join(self.filename, name + ".json")
+        return max((os.path.getmtime(p) for p in (path, path + ".log") if os.path.exists(p)), default=0)
+
+    def scan(self):
+        with self.lock(exclusive=False):
+            for _, shard_students, _ in self.read_shards(self.shard_names()):
+                yield from shard_students
+
+    # The shards that may hold roll: the one it was loaded from, the one its
+    # roll range names, or (by dept, not loaded) any of them
+    def candidates(self, roll):
+        if self.loaded:
+            return [self.location[roll]] if roll in self.location else []
+        if self.partition == "roll":
+            return [f"roll-{roll // self.ROLL_WIDTH * self.ROLL_WIDTH:06d}"]
+        return self.shard_names()
+
+    def get(self, roll):
+        with self.lock(exclusive=False):
+            for name in self.candidates(roll):
+                s = self.shard(name).get(roll)
+                if s is not None:
+                    return s
+        return None
+
+    # The shard each of rolls is in (None if in none); loaded, from memory,
+    # otherwise with one pass over the shards
+    def locate(self, rolls):
+        if self.loaded:
+            return {roll: self.location.get(roll) for roll in rolls}
+        if len(rolls) == 1:
+            (roll,) = rolls
+            return {roll: next((name for name in self.candidates(roll) if self.shard(name).get(roll) is not None), None)}
+        found = dict.fromkeys(rolls)
+        for name, shard_students, _ in self.read_shards(self.shard_names()):
+            found.update((s.student_roll, name) for s in shard_students if s.student_roll in found)
+        return found
+
+    def insert(self, student):
+        with self.lock():
+            name = self.shard_name(student)
+            self.shard(name).insert(student)
+            self.location[student.student_roll] = name
+            self.wrote(name)
+
+    def insert_many(self, students):
+        groups = {}
+        for s in students:
+            groups.setdefault(self.shard_name(s), []).append(s)
+        with self.lock():
+            for name, group in groups.items():
+                self.shard(name).insert_many(group)
+                self.location.update((s.student_roll, name) for s in group)
+                self.wrote(name)
+
+    # A student whose dept (or roll range) now belongs to another shard is moved:
+    # added to the new shard first, so a crash in between leaves a duplicate
+    # that the next load resolves rather than a lost student
+    def update(self, student):
+        with self.lock():
+            old = self.locate([student.student_roll])[student.student_roll]
+            name = self.shard_name(student)
+            if old is None or old == name:
+                self.shard(name).update(student)
+            else:
+                self.shard(name).insert(student)
+                self.shard(old).delete(student)
+                self.wrote(old)
+            self.location[student.student_roll] = name
+            self.wrote(name)
+
+    def delete(self, student):
+        with self.lock():
+            name = self.locate([student.student_roll])[student.student_roll]
+            if name is not None:
+                self.shard(name).delete(student)
+                self.location.pop(student.student_roll, None)
+                self.wrote(name)
+
+    # Each shard's part is committed as one unit. Students moving shard are
+    # added to their new shard in the first pass and removed from the old one
+    # in a second, so a crash in between duplicates rather than loses them.
+    def apply_changes(self, changes):
+        with self.lock():
+            groups = {}
+            moved = {}
+            where = self.locate(changes)
+            for roll, s in changes.items():
+                old = where[roll]
+                name = self.shard_name(s) if s is not None else old
+                if name is not None:
+                    groups.setdefault(name, {})[roll] = s
+                if s is not None and old is not None and old != name:
+                    moved.setdefault(old, {})[roll] = None
+            for stage in (groups, moved):
+                for name, part in stage.items():
+                    self.shard(name).apply_changes(part)
+                    self.wrote(name)
+            for roll, s in changes.items():
+                if s is None:
+                    self.location.pop(roll, None)
+                else:
+                    self.location[roll] = self.shard_name(s)
+
+    def save_all(self, students):
+        groups = {name: [] for name in self.shard_names()}
+        for s in students:
+            groups.setdefault(self.shard_name(s), []).append(s)
+        with self.lock():
+            saved = True
+            for name, group in groups.items():
+                saved = self.shard(name).save_all(group) and saved
+                self.wrote(name)
+            self.location = {s.student_roll: name for name, group in groups.items() for s in group}
+        return saved
+
+    def compact(self):
+        with self.lock():
+            for name in self.shard_names():
+                if self.shard(name).journal.size:
+                    self.shard(name).compact()
+                    self.wrote(name)
+
+    # After writing shard name: bump the store version and count the write as read
+    def wrote(self, name=None):
+        self.version = self.store_lock.bump()
+        if self.loaded and name is not None:
+            shard = self.shard(name)
+            self.seen[name] = (file_identity(shard.filename), shard.journal.size)
+
+    def state(self):
+        return self.store_lock.version()
+
+    # What other processes changed, shard by shard: new journal entries, or a
+    # full comparison for a shard someone rewrote. A student moved between
+    # shards shows up as deleted from one and added to the other.
+    def changes(self):
+        if not self.loaded:
+            return {}
+        with self.lock(exclusive=False):
+            version = self.store_lock.version()
+            if version == self.version:
+                return {}
+            changed = {}
+            current = None
+            for name in self.shard_names():
+                shard = self.shard(name)
+                if name in self.seen and file_identity(shard.filename) == self.seen[name][0]:
+                    identity, offset = self.seen[name]
+                    records, offset = shard.journal_changes(offset)
+                    part = {roll: Student.from_dict(r) if r is not None else None for roll, r in records.items()}
+                else:
+                    fresh = {s.student_roll: s for s in shard.scan()}
+                    identity, offset = shard.last_read
+                    if current is None:
+                        current = {s.student_roll: s for s in self.students}
+                    part = {roll: s for roll, s in fresh.items() if roll not in current or current[roll].to_dict() != s.to_dict()}
+                    part.update((roll, None) for roll, where in self.location.items() if where == name and roll not in fresh)
+                self.seen[name] = (identity, offset)
+                for roll, s in part.items():
+                    if s is not None:
+                        changed[roll] = s
+                        self.location[roll] = name
+                    elif roll not in changed and self.location.get(roll) == name:
+                        changed[roll] = None
+                        del self.location[roll]
+            self.version = version
+        return changed
+
+    def sync(self):
+        for shard in self.shards.values():
+            shard.sync()
+
+    # Journals of the shards written this session are folded in, as for one JSON file
+    def close(self):
+        with self.lock(exclusive=self.loaded):
+            for name, shard in self.shards.items():
+                if self.loaded and shard.journal.size:
+                    shard.compact()
+                    self.wrote(name)
+                shard.close()
+        self.store_lock.close()
+
+
+# SQLite database with indexed roll/email/dept columns; nothing is preloaded
+class SqliteBackend(StorageBackend):
+    preload = False
+
+    COLUMNS = "name, roll, cgpa, email, dept, semester, phone"
+    SELECT = f"SELECT {COLUMNS} FROM students"
+    INSERT = f"INSERT INTO students ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)"
+    UPDATE = "UPDATE students SET name = ?, cgpa = ?, email = ?, dept = ?, semester = ?, phone = ? WHERE roll = ?"
+
+    def __init__(self, filename="students.db"):
+        self.filename = filename
+        # SQLite serialises its own writes, but the manager's check-then-write
+        # steps and the change feed need the same store lock as the JSON store
+        self.store_lock = StoreLock(filename + ".lock")
+        self.conn = sqlite3.connect(filename)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS students (
+                roll INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                cgpa REAL NOT NULL,
+                email TEXT NOT NULL COLLATE NOCASE UNIQUE,
+                dept TEXT NOT NULL,
+                semester INTEGER NOT NULL,
+                phone TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_students_dept ON students (dept);
+        """)
+        self.merge_depts()
+
+    # Rows written before a dept alias existed are renamed to the canonical dept
+    def merge_depts(self):
+        with self.conn:
+            for (dept,) in self.conn.execute("SELECT DISTINCT dept FROM students").fetchall():
+                if dept_name(dept) != dept:
+                    self.conn.execute("UPDATE students SET dept = ? WHERE dept = ?", (dept_name(dept), dept))
+
+    def lock(self, exclusive=True):
+        return self.store_lock(exclusive)
+
+    def load(self):
+        return list(self.scan())
+
+    def scan(self):
+        scanned = 0
+        try:
+            for row in self.conn.execute(f"{self.SELECT} ORDER BY roll"):
+                scanned += 1
+                yield Student(*row)
+        finally:
+            if perf.enabled:
+                perf.count("records_scanned", scanned)
+
+    def get(self, roll):
+        row = self.conn.execute(f"{self.SELECT} WHERE roll = ?", (roll,)).fetchone()
+        return Student(*row) if row else None
+
+    def get_by_email(self, email):
+        row = self.conn.execute(f"{self.SELECT} WHERE email = ?", (email,)).fetchone()
+        return Student(*row) if row else None
+
+    def search_name(self, text):
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        rows = self.conn.execute(f"{self.SELECT} WHERE name LIKE ? ESCAPE '\\' ORDER BY roll", (pattern,))
+        text = text.lower()
+        return sorted((Student(*row) for row in rows), key=lambda s: match_rank(s.name.lower(), text))
+
+    def list_range(self, low=None, high=None, offset=0, limit=None):
+        rows = self.conn.execute(
+            f"{self.SELECT} WHERE roll BETWEEN ? AND ? ORDER BY roll LIMIT ? OFFSET ?",
+            (low if low is not None else 0, high if high is not None else 2**63 - 1, limit if limit is not None else -1, offset)
+        )
+        return [Student(*row) for row in rows]
+
+    def count_range(self, low=None, high=None):
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM students WHERE roll BETWEEN ? AND ?",
+            (low if low is not None else 0, high if high is not None else 2**63 - 1)
+        ).fetchone()[0]
+
+    # Each single change is committed on its own, so an interactive add survives
+    # Ctrl+C or a crash and the write lock isn't held between commands; only the
+    # batch calls below group many rows into one transaction
+    def insert(self, student):
+        with self.conn:
+            self.conn.execute(self.INSERT, self.row(student))
+        self.committed()
+
+    def insert_many(self, students):
+        with self.conn:
+            self.conn.executemany(self.INSERT, (self.row(s) for s in students))
+        self.committed()
+
+    def update(self, student):
+        with self.conn:
+            self.conn.execute(self.UPDATE, (
+                student.name, student.cgpa, student.email, student.dept, student.semester, student.phone, student.student_roll
+            ))
+        self.committed()
+
+    def delete(self, student):
+        with self.conn:
+            self.conn.execute("DELETE FROM students WHERE roll = ?", (student.student_roll,))
+        self.committed()
+
+    # One SQL transaction: every changed roll is removed, then the new versions inserted
+    def apply_changes(self, changes):
+        with self.conn:
+            self.conn.executemany("DELETE FROM students WHERE roll = ?", ((roll,) for roll in changes))
+            self.conn.executemany(self.INSERT, (self.row(s) for s in changes.values() if s is not None))
+        self.committed()
+
+    def save_all(self, students):
+        with self.conn:
+            self.conn.execute("DELETE FROM students")
+            self.conn.executemany(self.INSERT, (self.row(s) for s in students))
+        self.committed()
+        return True
+
+    def committed(self):
+        if perf.enabled:
+            perf.count("sqlite_commits")
+
+    def close(self):
+        self.conn.close()
+        self.store_lock.close()
+
+    @staticmethod
+    def row(s):
+        return (s.name, s.student_roll, s.cgpa, s.email, s.dept, s.semester, s.phone)
+
+
+# Dict-like view used as the roll/email index when the roster isn't preloaded
+class BackendLookup:
+    def __init__(self, lookup):
+        self.lookup = lookup
+
+    def get(self, key, default=None):
+        found = self.lookup(key)
+        return default if found is None else found
+
+    def __contains__(self, key):
+        return self.lookup(key) is not None
+
+
+def open_backend(filename, snapshot_format=None, shard_by=None, **options):
+    if filename.rstrip("/").endswith(".shards"):
+        return ShardedBackend(filename.rstrip("/"), partition=shard_by, snapshot_format=snapshot_format or DEFAULT_FORMAT, **options)
+    if filename.endswith((".db", ".sqlite", ".sqlite3")):
+        return SqliteBackend(filename, **options)  # SQLite keeps no snapshot
+    if filename.endswith(".bin"):
+        return BinaryBackend(filename, **options)
+    return JsonBackend(filename, snapshot_format=snapshot_format or DEFAULT_FORMAT, **options)
+
+
+# Copy every student from one store into a new one; the format of each follows
+# from its file name (.json, .bin, .db or a .shards folder), so this converts
+# between any of them; options (e.g. shard_by) are for the new store
+def convert_store(source, target, **options):
+    if os.path.exists(target):
+        raise FileExistsError(f"{target} already exists")
+    reader = open_backend(source)
+    writer = open_backend(target, **options)
+    try:
+        students = list(reader.scan())
+        with writer.lock():
+            writer.save_all(students)
+    finally:
+        reader.close()
+        writer.close()
+    return len(students)
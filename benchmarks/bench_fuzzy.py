@@ -0,0 +1,59 @@
+# Typo-tolerant name search: the BK-tree and phonetic index of fuzzy.py
+# against comparing the query with every name by Levenshtein distance.
+# Queries are roster names with one or two letters changed; both ways must
+# return the same ranking. Sizes are record counts, as for generate.py.
+# Run from the project folder: python benchmarks/bench_fuzzy.py [sizes...] [--queries N]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fuzzy import FuzzyIndex, brute_force
+from generate import make_records, parse_size
+
+
+def misspell(rng, name):
+    letters = list(name.lower())
+    for _ in range(rng.randint(1, 2)):
+        i = rng.randrange(len(letters))
+        if letters[i] != " ":
+            letters[i] = rng.choice("aeiouhnrs")
+    return "".join(letters)
+
+
+def main():
+    args = sys.argv[1:]
+    queries = 20
+    if "--queries" in args:
+        at = args.index("--queries")
+        queries = int(args[at + 1])
+        del args[at:at + 2]
+    sizes = [parse_size(arg) for arg in args] or [10_000, 100_000]
+    print(f"{'records':>8} {'words':>7} {'build s':>8} {'index ms':>9} {'brute ms':>9} {'speedup':>8}")
+    for count in sizes:
+        names = {r["roll"]: r["name"] for r in make_records(count)}
+        start = time.perf_counter()
+        index = FuzzyIndex()
+        for roll, name in names.items():
+            index.add(roll, name)
+        build = time.perf_counter() - start
+
+        rng = random.Random(count)
+        texts = [misspell(rng, name) for name in rng.sample(list(names.values()), queries)]
+        indexed = brute = 0.0
+        for text in texts:
+            start = time.perf_counter()
+            found = index.search(text, 10)
+            indexed += time.perf_counter() - start
+            start = time.perf_counter()
+            expected = brute_force(names, text, 10)
+            brute += time.perf_counter() - start
+            assert found == expected, f"different results for {text!r}"
+        indexed, brute = indexed / queries * 1000, brute / queries * 1000
+        print(f"{count:>8} {len(index.rolls):>7} {build:>8.2f} {indexed:>9.2f} {brute:>9.1f} {brute / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
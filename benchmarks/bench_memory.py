@@ -0,0 +1,64 @@
+# Memory used by the roster: the original dict-backed Student, the slotted
+# Student and the columnar StudentColumns store.
+# Run from the project folder: python benchmarks/bench_memory.py [records]
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from columnar import StudentColumns
+from models import Student
+
+DEPTS = ["CSE", "Electrical and Electronic Engineering", "Computer Science and Engineering", "Civil Engineering"]
+
+
+# The Student class as it was before __slots__
+class DictStudent:
+    def __init__(self, name, student_roll, cgpa, email, dept, semester, phone):
+        self.name = name
+        self.student_roll = student_roll
+        self.cgpa = cgpa
+        self.email = email
+        self.dept = dept
+        self.semester = semester
+        self.phone = phone
+
+
+def make_rows(count):
+    # Fields are built before measuring, so only the per-record containers are counted
+    return [(
+        f"Student Number {i}", 100000 + i, round((i % 401) / 100, 2), f"student{i}@example.com",
+        DEPTS[i % len(DEPTS)], f"{i % 8 + 1}th", f"017{i:08d}"
+    ) for i in range(count)]
+
+
+def measure(build, rows):
+    gc.collect()
+    tracemalloc.start()
+    roster = build(rows)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del roster
+    return current
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    builders = {
+        "dict Student": lambda rows: [DictStudent(*r) for r in rows],
+        "slotted Student": lambda rows: [Student(*r) for r in rows],
+        "StudentColumns": lambda rows: StudentColumns.from_students(Student(*r) for r in rows),
+    }
+    print(f"records: {count}")
+    baseline = None
+    for label, build in builders.items():
+        rows = make_rows(count)
+        used = measure(build, rows)
+        baseline = baseline or used
+        print(f"{label:<16} {used / 1e6:8.1f} MB  {used / count:6.0f} B/record  {used / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Substring name search: the trigram index against the old linear scan.
+# Run from the project folder: python benchmarks/bench_name_search.py [records]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ngram import TrigramIndex
+
+SYLLABLES = ["ha", "bi", "bul", "naz", "mus", "sa", "kib", "po", "ly", "jo", "sim", "tan", "vir", "far", "ra",
+             "nus", "rat", "ar", "if", "di", "ul", "is", "lam", "ak", "ter", "man", "hos", "sain", "med", "kha"]
+QUERIES = ["hasan", "md", "ak", "islam", "nusrat kh", "habibul", "zzz"]
+
+
+def make_name(rng):
+    words = ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))) for _ in range(rng.randint(2, 3))]
+    if rng.random() < 0.3:
+        words.insert(0, "md")
+    return " ".join(words)
+
+
+def make_names(count, seed=7):
+    rng = random.Random(seed)
+    return {100000 + i: make_name(rng) for i in range(count)}
+
+
+def timed(func, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    names = make_names(count)
+    start = time.perf_counter()
+    index = TrigramIndex()
+    for roll, name in names.items():
+        index.add(roll, name)
+    print(f"records: {count}, index build: {time.perf_counter() - start:.2f} s")
+    print(f"{'query':<12} {'matches':>8} {'scan ms':>9} {'index ms':>9} {'top 20 ms':>10}")
+    for query in QUERIES:
+        scan_time, expected = timed(lambda: [roll for roll, name in names.items() if query in name])
+        index_time, found = timed(lambda: index.search(query))
+        top_time, _ = timed(lambda: index.search(query, limit=20))
+        assert sorted(found) == sorted(expected), query
+        print(f"{query:<12} {len(found):>8} {scan_time * 1000:>9.2f} {index_time * 1000:>9.2f} {top_time * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Save and load throughput of the snapshot formats with each installed JSON
+# library. "json pretty" is how snapshots were written before: indented, from
+# to_dict() copies, and read back with the general streaming parser.
+# Run from the project folder: python benchmarks/bench_serializer.py [records]
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serializer
+from generate import make_records
+from models import Student
+from storage import read_snapshot, write_snapshot
+
+
+def best_of(func, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    students = [Student.from_dict(r) for r in make_records(count)]
+    print(f"records: {count}, libraries installed: {', '.join(serializer.ENGINES)}")
+    print(f"{'library':<8} {'format':<8} {'size MB':>8} {'save s':>8} {'records/s':>10} {'load s':>8} {'records/s':>10}")
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "students_db.json")
+        for engine in serializer.ENGINES:
+            serializer.use(engine)
+            for fmt in serializer.FORMATS:
+                if fmt == "pretty" and engine != "json":
+                    continue  # always written by the standard library
+                save = best_of(lambda: write_snapshot(path, students, generations=0, fmt=fmt))
+                load = best_of(lambda: [Student.from_dict(r) for r in read_snapshot(path, generations=0)])
+                size = os.path.getsize(path) / 1e6
+                print(f"{engine:<8} {fmt:<8} {size:>8.1f} {save:>8.3f} {count / save:>10.0f} {load:>8.3f} {count / load:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
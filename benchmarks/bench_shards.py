@@ -0,0 +1,67 @@
+# Load time of a sharded store (one JSON file per dept, or per roll range) read
+# by 1, 2, ... worker processes, against the same roster in one JSON file, and
+# the time to fold one change back into the files: the whole roster for the
+# single file, only the changed student's shard for the sharded store.
+# Run from the project folder: python benchmarks/bench_shards.py [records] [max workers]
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backends import JsonBackend, ShardedBackend, convert_store
+from generate import make_records
+from storage import write_snapshot
+
+REPEAT = 3
+
+
+def median_time(func):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def load(backend):
+    backend.load()
+    backend.close()
+
+
+# Change one student, then time the rewrite that folds the change in
+def rewrite(backend):
+    s = backend.load()[0]
+    backend.update(s)
+    start = time.perf_counter()
+    backend.compact()
+    elapsed = time.perf_counter() - start
+    backend.close()
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    most = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "students_db.json")
+        write_snapshot(path, make_records(count), generations=0)
+        print(f"records: {count}, cores: {os.cpu_count()}")
+        print(f"{'store':<18} {'shards':>6} {'workers':>7} {'load s':>8} {'rewrite s':>10}")
+        single = median_time(lambda: load(JsonBackend(path)))
+        print(f"{'one file':<18} {1:>6} {1:>7} {single:>8.3f} {rewrite(JsonBackend(path)):>10.3f}")
+        for partition in ShardedBackend.PARTITIONS:
+            directory = os.path.join(folder, f"by-{partition}.shards")
+            convert_store(path, directory, shard_by=partition)
+            shards = len(ShardedBackend(directory).shard_names())
+            for workers in range(1, most + 1):
+                elapsed = median_time(lambda: load(ShardedBackend(directory, workers=workers)))
+                print(f"{'by ' + partition:<18} {shards:>6} {workers:>7} {elapsed:>8.3f}", end="")
+                print(f" {rewrite(ShardedBackend(directory)):>10.3f}" if workers == 1 else "")
+
+
+if __name__ == "__main__":
+    main()
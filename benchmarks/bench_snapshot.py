@@ -0,0 +1,55 @@
+# Compare the atomic snapshot write against the old plain json.dump rewrite.
+# Run from the project folder: python benchmarks/bench_snapshot.py [records]
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import write_snapshot
+
+
+def make_records(count):
+    return [{
+        "name": f"Student Number {i}",
+        "roll": 100000 + i,
+        "cgpa": round((i % 401) / 100, 2),
+        "email": f"student{i}@example.com",
+        "dept": "CSE",
+        "semester": "5th",
+        "phone": f"017{i:08d}"
+    } for i in range(count)]
+
+
+def plain_write(path, records):
+    with open(path, "w") as file:
+        json.dump(records, file, indent=4)
+
+
+def best_of(func, repeat=5):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = make_records(count)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "students_db.json")
+        plain = best_of(lambda: plain_write(path, records))
+        # Same indented layout as the old rewrite, so only the atomic-write overhead differs
+        atomic = best_of(lambda: write_snapshot(path, records, fmt="pretty"))
+    print(f"records:        {count}")
+    print(f"plain write:    {plain * 1000:.1f} ms")
+    print(f"atomic write:   {atomic * 1000:.1f} ms")
+    print(f"overhead:       {(atomic / plain - 1) * 100:+.1f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Time to answer one lookup by roll from a cold start, for each store format:
+# in-process (open the store, get one student, close it) and as a whole
+# `main.py get` command. The JSON store has to parse the file first, the binary
+# record file only searches its roll directory, SQLite uses its primary key.
+# Run from the project folder: python benchmarks/bench_startup.py [records]
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backends import convert_store
+from generate import make_records
+from manager import StudentManager
+from storage import write_snapshot
+
+REPEAT = 5
+
+
+def median_time(func):
+    times = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def lookup(path, roll, preload):
+    manager = StudentManager(path, preload=preload)
+    assert manager.get_student(roll) is not None
+    manager.close()
+
+
+def command(path, roll):
+    subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--db", path, "get", "--roll", str(roll)],
+                   check=True, stdout=subprocess.DEVNULL)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    records = make_records(count)
+    roll = records[count // 2]["roll"]
+    with tempfile.TemporaryDirectory() as folder:
+        stores = {"json": os.path.join(folder, "students_db.json")}
+        write_snapshot(stores["json"], records, generations=0)
+        for name, extension in (("binary", ".bin"), ("sqlite", ".db")):
+            stores[name] = os.path.join(folder, "students" + extension)
+            convert_store(stores["json"], stores[name])
+
+        interpreter = median_time(lambda: subprocess.run([sys.executable, "-c", "pass"], check=True))
+        print(f"records: {count}, median of {REPEAT} runs; a bare interpreter starts in {interpreter * 1000:.0f} ms")
+        print(f"{'store':<14} {'size MB':>8} {'open+get ms':>12} {'command ms':>11}")
+        rows = [("json loaded", "json", True), ("json", "json", False), ("binary", "binary", False), ("sqlite", "sqlite", False)]
+        for label, store, preload in rows:
+            path = stores[store]
+            in_process = median_time(lambda: lookup(path, roll, preload))
+            whole = median_time(lambda: command(path, roll)) if not preload else None
+            size = os.path.getsize(path) / 1e6
+            print(f"{label:<14} {size:>8.1f} {in_process * 1000:>12.2f} {'' if whole is None else f'{whole * 1000:.0f}':>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+# Checks of the store's safety guarantees, each on a throwaway students_db.json:
+# - journal replay: changes made by a process that dies without saving are
+#   read back from the journal, and a torn last entry is dropped;
+# - crash-safe snapshots: a snapshot write that fails part way leaves the old
+#   file in place, and a corrupt file is recovered from its backup generation;
+# - locking conflicts: a write waits for another holder of the lock, and an
+#   edit of a student someone else changed since it was read is refused;
+# - transaction rollback: a block that raises, fails its email check or whose
+#   write fails leaves the roster, the store and the change feed as they were;
+# - email index: emails swapped or reused within one transaction, here or in
+#   another process, still map to their new owners and can't be taken again.
+# Each check asserts; the script exits with status 1 if any of them fails.
+# Run from the project folder: python benchmarks/check_store.py
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import serializer
+from manager import StudentManager
+from models import Student
+from storage import ConflictError, CorruptDatabaseError, read_snapshot, write_snapshot
+from transaction import TransactionError
+from validations import ValidationError
+
+FIRST_ROLL = 200000
+
+
+def student(n, **fields):
+    s = Student(f"Student {chr(65 + n % 26)}", FIRST_ROLL + n, 3.0, f"s{n}@example.com", "CSE", 1, "01700000000")
+    for field, value in fields.items():
+        setattr(s, field, value)
+    return s
+
+
+def roster(path):
+    manager = StudentManager(path)
+    try:
+        return {s.student_roll: s.to_dict() for s in manager.students}
+    finally:
+        manager.close()
+
+
+def seed(path, count=10):
+    manager = StudentManager(path)
+    manager.add_students([student(n) for n in range(count)])
+    manager.close()
+
+
+# Runs in a child process: make some changes, then die without closing the manager
+def edit_and_crash(path):
+    manager = StudentManager(path)
+    manager.create_student("Crash Test", FIRST_ROLL + 100, 3.5, "crash@example.com", "EEE", 2, "01711111111")
+    manager.modify_student(FIRST_ROLL + 1, cgpa=3.9)
+    manager.remove_student(FIRST_ROLL + 2)
+    manager.backend.sync()
+    os._exit(0)
+
+
+def check_journal_replay(folder):
+    path = os.path.join(folder, "students_db.json")
+    seed(path)
+    child = multiprocessing.Process(target=edit_and_crash, args=(path,))
+    child.start()
+    child.join()
+    assert os.path.getsize(path + ".log") > 0, "the changes should still be in the journal"
+
+    # Half an entry, as a crash in the middle of an append would leave it
+    with open(path + ".log", "a", encoding="utf-8") as file:
+        file.write('{"op": "update", "record": {"name": "Torn')
+    students = roster(path)
+    assert students[FIRST_ROLL + 100]["email"] == "crash@example.com"
+    assert students[FIRST_ROLL + 1]["cgpa"] == 3.9
+    assert FIRST_ROLL + 2 not in students
+    assert len(students) == 10
+
+    # close() folded the journal into the snapshot; reading it again gives the same roster
+    assert not os.path.exists(path + ".log") or os.path.getsize(path + ".log") == 0
+    assert roster(path) == students
+
+
+def check_crash_safe_snapshots(folder):
+    path = os.path.join(folder, "students_db.json")
+    records = [student(n).to_dict() for n in range(5)]
+    write_snapshot(path, records)
+    with open(path, "rb") as file:
+        before = file.read()
+
+    # A write that fails part way never touches the live file
+    original = serializer.write_array
+    def fail_half_way(file, rows, fmt):
+        file.write(b"[\n")
+        raise OSError("disk full")
+    serializer.write_array = fail_half_way
+    try:
+        write_snapshot(path, records + [student(5).to_dict()])
+        raise AssertionError("the failing write should raise")
+    except OSError:
+        pass
+    finally:
+        serializer.write_array = original
+    with open(path, "rb") as file:
+        assert file.read() == before, "a failed write must leave the snapshot as it was"
+    assert list(read_snapshot(path)) == records
+
+    # The next save keeps the previous snapshot as generation .1
+    write_snapshot(path, records + [student(5).to_dict()])
+    assert list(read_snapshot(path + ".1", generations=0)) == records
+
+    # A live file cut short is skipped in favour of the newest good backup
+    with open(path, "r+b") as file:
+        file.truncate(os.path.getsize(path) // 2)
+    assert list(roster(path).values()) == records
+
+    # With every generation corrupt, the store refuses to open rather than start empty
+    for candidate in (path, path + ".1"):
+        with open(candidate, "w", encoding="utf-8") as file:
+            file.write("[\n{\"roll\": ")
+    try:
+        StudentManager(path)
+        raise AssertionError("a corrupt store should not open")
+    except CorruptDatabaseError:
+        pass
+
+
+def check_locking_conflicts(folder):
+    path = os.path.join(folder, "students_db.json")
+    seed(path)
+    first = StudentManager(path)
+    second = StudentManager(path)
+    try:
+        # Both read the student; the first to write wins, the other is refused
+        mine = second.get_student(FIRST_ROLL + 3)
+        expected = mine.to_dict()
+        first.modify_student(FIRST_ROLL + 3, cgpa=2.5)
+        updated = mine.copy()
+        updated.cgpa = 3.75
+        try:
+            second.apply_update(mine, updated, expected)
+            raise AssertionError("an edit of a changed student should be refused")
+        except ConflictError:
+            pass
+        second.refresh()
+        assert second.get_student(FIRST_ROLL + 3).cgpa == 2.5
+
+        # Deleting a student someone else changed is refused the same way
+        stale = second.get_student(FIRST_ROLL + 4).to_dict()
+        first.modify_student(FIRST_ROLL + 4, phone="01799999999")
+        try:
+            second.drop_student(second.get_student(FIRST_ROLL + 4), stale)
+            raise AssertionError("a delete of a changed student should be refused")
+        except ConflictError:
+            pass
+
+        # A write waits while another manager holds the store lock
+        done = threading.Event()
+        def add():
+            second.create_student("Waiting Writer", FIRST_ROLL + 50, 3.0, "waiting@example.com", "CSE", 1, "01700000000")
+            done.set()
+        with first.backend.lock():
+            writer = threading.Thread(target=add)
+            writer.start()
+            time.sleep(0.2)
+            assert not done.is_set(), "the write should wait for the lock"
+        writer.join(5)
+        assert done.is_set()
+        first.refresh()
+        assert first.get_student(FIRST_ROLL + 50) is not None
+
+        # A roll taken by another manager is caught under the lock, even in a batch
+        first.create_student("Taken Roll", FIRST_ROLL + 60, 3.0, "taken@example.com", "CSE", 1, "01700000000")
+        try:
+            second.add_students([student(60, email="other@example.com"), student(61)])
+            raise AssertionError("a clashing batch should be refused")
+        except TransactionError as e:
+            assert list(e.errors) == [FIRST_ROLL + 60]
+        assert second.get_student(FIRST_ROLL + 61) is None
+    finally:
+        first.close()
+        second.close()
+
+
+def check_transaction_rollback(folder):
+    path = os.path.join(folder, "students_db.json")
+    seed(path)
+    manager = StudentManager(path)
+    try:
+        before = {s.student_roll: s.to_dict() for s in manager.students}
+        latest = manager.feed.latest()
+
+        # An exception in the block stages nothing
+        try:
+            with manager.transaction() as tx:
+                tx.update(FIRST_ROLL + 1, cgpa=1.0)
+                tx.delete(FIRST_ROLL + 2)
+                raise RuntimeError("changed my mind")
+        except RuntimeError:
+            pass
+        assert {s.student_roll: s.to_dict() for s in manager.students} == before
+        assert manager.feed.latest() == latest
+
+        # A failed email check at the end rejects the whole group
+        try:
+            with manager.transaction() as tx:
+                tx.update(FIRST_ROLL + 1, cgpa=1.0)
+                tx.update(FIRST_ROLL + 2, email="s3@example.com")
+            raise AssertionError("a duplicate email should fail the transaction")
+        except TransactionError as e:
+            assert list(e.errors) == [FIRST_ROLL + 2]
+        assert {s.student_roll: s.to_dict() for s in manager.students} == before
+
+        # Swapping two emails within one transaction is fine
+        with manager.transaction() as tx:
+            tx.update(FIRST_ROLL + 1, email="s2@example.com")
+            tx.update(FIRST_ROLL + 2, email="s1@example.com")
+        assert manager.get_student(FIRST_ROLL + 1).email == "s2@example.com"
+        before = {s.student_roll: s.to_dict() for s in manager.students}
+
+        # A write that fails puts the roster back, and the feed is put right at once
+        original = manager.backend.apply_changes
+        def fail(changes):
+            raise OSError("disk full")
+        manager.backend.apply_changes = fail
+        try:
+            with manager.transaction() as tx:
+                tx.delete(FIRST_ROLL + 5)
+                tx.add("Never Saved", FIRST_ROLL + 70, 3.0, "never@example.com", "CSE", 1, "01700000000")
+            raise AssertionError("the failing write should raise")
+        except OSError:
+            pass
+        finally:
+            manager.backend.apply_changes = original
+        assert {s.student_roll: s.to_dict() for s in manager.students} == before
+        assert manager.get_student(FIRST_ROLL + 70) is None
+        assert feed_roster(manager) == before, "replaying the feed should end in the stored roster"
+        assert not manager.feed.pending()
+    finally:
+        manager.close()
+
+    assert roster(path) == before
+    reopened = StudentManager(path)
+    try:
+        assert feed_roster(reopened) == before
+    finally:
+        reopened.close()
+
+
+# The roster a reader of the change feed ends up with
+def feed_roster(manager):
+    final = {}
+    for entry in manager.changes_since(0):
+        final[entry["roll"]] = entry.get("record")
+    return {roll: record for roll, record in final.items() if record is not None}
+
+
+def assert_emails_indexed(manager):
+    for s in manager.students:
+        assert manager.email_index.get(s.email.lower()) is s, f"{s.email} is not indexed to {s.student_roll}"
+    assert len(manager.email_index) == len(manager.students)
+
+
+def check_email_index(folder):
+    path = os.path.join(folder, "students_db.json")
+    # Large enough that a two-student transaction updates the indexes in place instead of rebuilding them
+    seed(path, 30)
+    manager = StudentManager(path)
+    other = StudentManager(path)
+    try:
+        with manager.transaction() as tx:
+            tx.update(FIRST_ROLL, email="s1@example.com")
+            tx.update(FIRST_ROLL + 1, email="s0@example.com")
+        assert_emails_indexed(manager)
+        try:
+            manager.create_student("Email Thief", FIRST_ROLL + 80, 3.0, "s1@example.com", "CSE", 1, "01700000000")
+            raise AssertionError("a swapped email should still count as taken")
+        except ValidationError:
+            pass
+
+        # One student leaves and a new one takes their email, in either order
+        with manager.transaction() as tx:
+            tx.add("New Student", FIRST_ROLL + 81, 3.0, "s5@example.com", "CSE", 1, "01700000000")
+            tx.delete(FIRST_ROLL + 5)
+        assert_emails_indexed(manager)
+        assert manager.email_index["s5@example.com"].student_roll == FIRST_ROLL + 81
+
+        # The same swap made by another process arrives through refresh()
+        with other.transaction() as tx:
+            tx.update(FIRST_ROLL + 2, email="s3@example.com")
+            tx.update(FIRST_ROLL + 3, email="s2@example.com")
+        manager.refresh()
+        assert_emails_indexed(manager)
+        assert manager.email_index["s2@example.com"].student_roll == FIRST_ROLL + 3
+    finally:
+        manager.close()
+        other.close()
+
+
+CHECKS = [check_journal_replay, check_crash_safe_snapshots, check_locking_conflicts, check_transaction_rollback, check_email_index]
+
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        with tempfile.TemporaryDirectory() as folder:
+            try:
+                check(folder)
+                print(f"ok      {check.__name__}")
+            except Exception:
+                failed += 1
+                print(f"FAILED  {check.__name__}")
+                traceback.print_exc()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+# Deterministic roster generator for the benchmarks: the same count and seed
+# always give the same students, and every record passes validations.py.
+# Rolls are six digits, so at most 999,999 students fit; the "1m" size is that.
+# Run from the project folder: python benchmarks/generate.py <10k|100k|1m|count> <output.json> [seed]
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import write_snapshot
+from validations import validate_columns
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 999_999}
+SYLLABLES = ["ra", "hi", "ma", "sa", "ki", "no", "ta", "fa", "ri", "mu", "na", "la", "ja", "ha", "di", "bu",
+             "sha", "tan", "vir", "mit", "kar", "ful", "zan", "rak", "hin", "dul", "mon", "sel"]
+LAST_NAMES = ["Akter", "Islam", "Rahman", "Hossain", "Ahmed", "Khan", "Chowdhury", "Sarkar", "Uddin", "Alam", "Miah",
+              "Begum", "Sultana", "Haque", "Karim", "Mondal", "Roy", "Das", "Saha", "Biswas", "Talukder", "Bhuiyan"]
+# Mostly short names, with some long spellings that are stored as their alias
+DEPTS = ["CSE", "CSE", "EEE", "EEE", "ECE", "ME", "CE", "IPE", "BBA",
+         "Computer Science and Engineering", "Electrical and Electronic Engineering", "Civil Engineering"]
+DOMAINS = ["example.com", "student.example.edu", "mail.example.org"]
+
+
+def parse_size(text):
+    return SIZES[text.lower()] if text.lower() in SIZES else int(text)
+
+
+def make_name(rng):
+    first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{first.capitalize()} {rng.choice(LAST_NAMES)}"
+
+
+# Records as stored in students_db.json, in a shuffled (but repeatable) roll order
+def make_records(count, seed=0):
+    if not 0 <= count <= 999_999:
+        raise ValueError("count must be between 0 and 999999")
+    rng = random.Random(seed)
+    # Keep to 100000-999999 while they suffice; the low rolls are zero-padded
+    pool = range(100_000, 1_000_000) if count <= 900_000 else range(1, 1_000_000)
+    records = []
+    for roll in rng.sample(pool, count):
+        name = make_name(rng)
+        records.append({
+            "name": name,
+            "roll": roll,
+            "cgpa": round(rng.uniform(2.0, 4.0), 2),
+            "email": f"{name.replace(' ', '.').lower()}.{roll:06d}@{rng.choice(DOMAINS)}",
+            "dept": rng.choice(DEPTS),
+            "semester": rng.randint(1, 8),
+            "phone": f"01{rng.randint(3, 9)}{rng.randrange(10 ** 8):08d}",
+        })
+    return records
+
+
+# Run the records through the same checks as imported rows; returns the number rejected
+def check_records(records):
+    columns = {field: [] for field in ("name", "roll", "cgpa", "email", "dept", "semester", "phone")}
+    for r in records:
+        for field, values in columns.items():
+            values.append(f"{r['roll']:06d}" if field == "roll" else str(r[field]))
+    return sum(1 for row in validate_columns(columns) if row)
+
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python benchmarks/generate.py <10k|100k|1m|count> <output.json> [seed]")
+        return 2
+    count = parse_size(sys.argv[1])
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    records = make_records(count, seed)
+    rejected = check_records(records)
+    if rejected:
+        print(f"Error: {rejected} generated records fail validation.")
+        return 1
+    write_snapshot(sys.argv[2], records, generations=0)
+    print(f"Wrote {count} students to {sys.argv[2]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
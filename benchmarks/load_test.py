@@ -0,0 +1,169 @@
+# Load test for the HTTP service: starts `main.py serve` on a throwaway copy of
+# a generated roster, then keeps a number of keep-alive connections busy with a
+# mix of lookups, name searches and updates, and reports requests/sec and
+# p50/p99 latency per kind of request.
+# Run from the project folder: python benchmarks/load_test.py [records] [connections] [seconds]
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from manager import StudentManager
+from models import Student
+
+FIRST_ROLL = 100000
+FIRST_NAMES = ["Hasan", "Rahim", "Karim", "Nusrat", "Tania", "Sakib", "Farhan", "Jahan", "Mitu", "Rafi", "Sumaiya", "Tanvir",
+               "Arif", "Shuvo", "Nadia", "Imran", "Lamia", "Fahim", "Riya", "Sadia", "Mahin", "Tasnim", "Rakib", "Anika"]
+LAST_NAMES = ["Akter", "Islam", "Rahman", "Hossain", "Ahmed", "Khan", "Chowdhury", "Sarkar", "Uddin", "Alam", "Miah",
+              "Begum", "Sultana", "Haque", "Karim", "Mondal", "Roy", "Das", "Saha", "Biswas"]
+MIX = [("get", 0.8), ("search", 0.1), ("update", 0.1)]
+
+
+def make_roster(path, count):
+    manager = StudentManager(path)
+    manager.add_students([
+        Student(f"{FIRST_NAMES[i % 24]} {LAST_NAMES[i * 7 % 20]}", FIRST_ROLL + i, round((i % 401) / 100, 2),
+                f"student{i}@example.com", "CSE", i % 8 + 1, f"017{i:08d}")
+        for i in range(count)
+    ])
+    manager.close()
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for(port, timeout=60):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def request(reader, writer, method, target, body=None):
+    data = json.dumps(body).encode() if body is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b"\r\n":
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    await reader.readexactly(length)
+    return status
+
+
+async def client(port, count, until, latencies, errors):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    kinds, weights = zip(*MIX)
+    while time.perf_counter() < until:
+        kind = random.choices(kinds, weights)[0]
+        roll = FIRST_ROLL + random.randrange(count)
+        start = time.perf_counter()
+        if kind == "get":
+            status = await request(reader, writer, "GET", f"/students/{roll}")
+        elif kind == "search":
+            status = await request(reader, writer, "GET", f"/students?name={quote(random.choice(FIRST_NAMES) + ' ' + random.choice(LAST_NAMES))}&limit=10")
+        else:
+            status = await request(reader, writer, "PATCH", f"/students/{roll}", {"cgpa": round(random.uniform(2, 4), 2)})
+        latencies[kind].append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(status)
+    writer.close()
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+async def run_clients(port, count, connections, until):
+    latencies = {kind: [] for kind, _ in MIX}
+    errors = []
+    await asyncio.gather(*(client(port, count, until, latencies, errors) for _ in range(connections)))
+    return latencies, errors
+
+
+# One client process; a single Python process can't generate enough load on its own
+def client_process(port, count, connections, until, seed, results):
+    random.seed(seed)
+    results.put(asyncio.run(run_clients(port, count, connections, until)))
+
+
+def run(port, count, connections, seconds, processes):
+    asyncio.run(wait_for(port))
+    results = multiprocessing.Queue()
+    until = time.perf_counter() + seconds
+    workers = [
+        multiprocessing.Process(target=client_process, args=(port, count, connections // processes, until, n, results))
+        for n in range(processes)
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    latencies = {kind: [] for kind, _ in MIX}
+    errors = []
+    for _ in workers:
+        part, part_errors = results.get()
+        for kind, values in part.items():
+            latencies[kind].extend(values)
+        errors.extend(part_errors)
+    for w in workers:
+        w.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    connections = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 10
+    processes = min(4, connections, max(1, (os.cpu_count() or 2) - 1))
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "students_db.json")
+        make_roster(path, count)
+        port = free_port()
+        server = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "main.py"), "--db", path, "serve", "--port", str(port)],
+            stdout=subprocess.DEVNULL
+        )
+        try:
+            latencies, errors, elapsed = run(port, count, connections, seconds, processes)
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"records: {count}, connections: {connections} from {processes} processes, {elapsed:.1f} s")
+    print(f"{'request':<10} {'count':>8} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for kind, values in latencies.items():
+        if values:
+            print(f"{kind:<10} {len(values):>8} {len(values) / elapsed:>8.0f} {percentile(values, 50) * 1000:>8.2f} {percentile(values, 99) * 1000:>8.2f}")
+    every = [v for values in latencies.values() for v in values]
+    print(f"{'all':<10} {total:>8} {total / elapsed:>8.0f} {percentile(every, 50) * 1000:>8.2f} {percentile(every, 99) * 1000:>8.2f}")
+    if errors:
+        print(f"non-200 responses: {len(errors)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# Several processes edit one students_db.json at once and the result is checked
+# for lost updates. Each worker repeatedly bumps a counter kept in the phone
+# number of a few shared students (read, edit, write back, retrying when the
+# write is rejected as a conflict) and adds students of its own. Half the
+# workers hold the roster in memory, the rest read it from disk on demand, and
+# a small journal threshold makes compactions happen while others are writing.
+# Run from the project folder: python benchmarks/stress_concurrency.py [workers] [operations]
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from manager import StudentManager
+from models import Student
+from storage import ConflictError
+
+SHARED = 5  # students whose counters every worker bumps
+FIRST_ROLL = 100000
+COMPACT_THRESHOLD = 16 * 1024
+
+
+def counter(student):
+    return int(student.phone[2:])
+
+
+def worker(path, number, operations, results):
+    random.seed(number)
+    manager = StudentManager(path, preload=number % 2 == 0, compact_threshold=COMPACT_THRESHOLD)
+    bumps = conflicts = added = 0
+    for i in range(operations):
+        if random.random() < 0.2:
+            roll = FIRST_ROLL + 10000 * (number + 1) + i
+            manager.create_student(f"Worker {chr(65 + number % 26)}", roll, 3.0, f"w{number}.{i}@example.com", "CSE", 1, "01700000000")
+            added += 1
+            continue
+        roll = FIRST_ROLL + random.randrange(SHARED)
+        while True:
+            manager.refresh()
+            s = manager.get_student(roll)
+            expected = s.to_dict()
+            updated = s.copy()
+            updated.phone = f"01{counter(s) + 1:09d}"
+            try:
+                manager.apply_update(s, updated, expected)
+                bumps += 1
+                break
+            except ConflictError:
+                conflicts += 1
+    manager.close()
+    results.put((bumps, conflicts, added))
+
+
+def main():
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "students_db.json")
+        manager = StudentManager(path)
+        manager.add_students([
+            Student(f"Shared Student {i}", FIRST_ROLL + i, 3.0, f"shared{i}@example.com", "CSE", 1, "01000000000")
+            for i in range(SHARED)
+        ])
+        manager.close()
+
+        results = multiprocessing.Queue()
+        start = time.perf_counter()
+        processes = [multiprocessing.Process(target=worker, args=(path, n, operations, results)) for n in range(workers)]
+        for p in processes:
+            p.start()
+        totals = [results.get() for _ in processes]
+        for p in processes:
+            p.join()
+        elapsed = time.perf_counter() - start
+
+        bumps = sum(t[0] for t in totals)
+        conflicts = sum(t[1] for t in totals)
+        added = sum(t[2] for t in totals)
+        manager = StudentManager(path)
+        counted = sum(counter(manager.get_student(FIRST_ROLL + i)) for i in range(SHARED))
+        stored = len(manager.students) - SHARED
+        unique = len({s.student_roll for s in manager.students}) == len(manager.students)
+        manager.close()
+
+    print(f"workers:           {workers} x {operations} operations")
+    print(f"time:              {elapsed:.2f} s ({workers * operations / elapsed:.0f} operations/s)")
+    print(f"conflicts retried: {conflicts}")
+    print(f"counter bumps:     {bumps} made, {counted} stored")
+    print(f"students added:    {added} made, {stored} stored")
+    ok = bumps == counted and added == stored and unique
+    print("no lost updates" if ok else "LOST UPDATES")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
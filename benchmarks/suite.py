@@ -0,0 +1,158 @@
+# Benchmark suite over generated rosters (see generate.py). For each size it times
+# loading and saving the store, roll/email/name lookups, rendering every page of
+# view_all, delete/add/update loops through the manager API, and the peak memory
+# of opening the store, then prints the results as JSON. Save the output of two
+# commits and pass them to --compare to see what changed.
+# Run from the project folder:
+#   python benchmarks/suite.py [10k 100k 1m ...] [--out results.json] [--ops 1000] [--seed 0]
+#   python benchmarks/suite.py --compare before.json after.json
+import argparse
+import contextlib
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from backends import open_backend
+from generate import make_records, parse_size
+from manager import StudentManager
+from storage import write_snapshot
+
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+# Microseconds per call of func over each of the items
+def per_op(func, items):
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / max(1, len(items)) * 1e6
+
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+
+def run_size(count, ops, seed, folder):
+    path = os.path.join(folder, f"students_{count}.json")
+    records = make_records(count, seed)
+    write_snapshot(path, records, generations=0)
+    rng = random.Random(seed + 1)
+    sample = rng.sample(records, min(ops, count))
+    results = {"records": count, "file_mb": round(os.path.getsize(path) / 1e6, 2)}
+
+    log(f"{count} records: load/save")
+    backend = open_backend(path)
+    results["load_data_s"] = timed(backend.load)
+    backend.close()
+    manager = None
+
+    def open_manager():
+        nonlocal manager
+        manager = StudentManager(path)
+
+    # load_data plus building every index
+    results["open_s"] = timed(open_manager)
+    results["save_data_s"] = timed(manager.save_data)
+
+    log(f"{count} records: lookups")
+    results["roll_lookup_us"] = per_op(manager.get_student, [r["roll"] for r in sample])
+    results["email_lookup_us"] = per_op(lambda email: manager.find_students(email=email), [r["email"] for r in sample])
+    # Searches for the start of a name, as typed into the search menu
+    prefixes = [r["name"][:rng.randint(3, len(r["name"]))] for r in sample[:1000]]
+    results["name_search_us"] = per_op(lambda name: manager.find_by_name(name.lower(), 10), prefixes)
+
+    log(f"{count} records: view_all")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull), mock.patch("builtins.input", return_value=""):
+        results["view_all_s"] = timed(manager.view_all)
+
+    # Delete the sample and add it back, so the loops also work on a full roll range
+    log(f"{count} records: delete/add/update")
+    results["delete_us"] = per_op(manager.remove_student, [r["roll"] for r in sample])
+    results["add_us"] = per_op(lambda r: manager.create_student(**{**r, "roll": f"{r['roll']:06d}"}), sample)
+    results["update_us"] = per_op(lambda r: manager.modify_student(r["roll"], cgpa=round(rng.uniform(2.0, 4.0), 2)), sample)
+    manager.close()
+
+    log(f"{count} records: memory")
+    tracemalloc.start()
+    manager = StudentManager(path)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    manager.close()
+    results["retained_memory_mb"] = round(retained / 1e6, 2)
+    results["peak_memory_mb"] = round(peak / 1e6, 2)
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in results.items()}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Print each metric of two result files side by side; times and memory are lower-is-better
+def compare(before_path, after_path):
+    with open(before_path) as file:
+        before = {r["records"]: r for r in json.load(file)["results"]}
+    with open(after_path) as file:
+        after = {r["records"]: r for r in json.load(file)["results"]}
+    print(f"{'records':>8} {'metric':<20} {'before':>12} {'after':>12} {'change':>8}")
+    for count in sorted(set(before) & set(after)):
+        for metric, old in before[count].items():
+            new = after[count].get(metric)
+            if metric == "records" or new is None:
+                continue
+            change = f"{(new - old) / old * 100:+.1f}%" if old else ""
+            print(f"{count:>8} {metric:<20} {old:>12} {new:>12} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the student store on generated rosters.")
+    parser.add_argument("sizes", nargs="*", default=["10k", "100k"], help="roster sizes: 10k, 100k, 1m or a number")
+    parser.add_argument("--ops", type=int, default=1000, help="operations per lookup/add/update/delete loop")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write the JSON here instead of to stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "ops": args.ops,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as folder:
+        for size in args.sizes:
+            report["results"].append(run_size(parse_size(size), args.ops, args.seed, folder))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as file:
+            file.write(text + "\n")
+        log(f"Results written to {args.out}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
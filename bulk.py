@@ -0,0 +1,125 @@
+import csv
+import json
+import os
+from models import Student
+from validations import MESSAGES, clean_input, validate_columns
+
+FIELDS = ["name", "roll", "cgpa", "email", "dept", "semester", "phone"]
+BATCH_SIZE = 10_000  # rows validated together
+
+
+def file_format(path):
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def read_rows(path):
+    # Stream rows as dicts from a CSV file (with a header) or a JSON Lines file;
+    # a JSON line that isn't an object comes through as None.
+    # utf-8-sig drops the byte order mark Excel puts before the header.
+    with open(path, "r", newline="", encoding="utf-8-sig") as file:
+        if file_format(path) == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    row = None
+                yield row if isinstance(row, dict) else None
+
+
+class RowWriter:
+    def __init__(self, path, fields):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.fields = fields
+        self.csv = csv.DictWriter(self.file, fieldnames=fields, extrasaction="ignore") if file_format(path) == "csv" else None
+        if self.csv:
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.csv:
+            self.csv.writerow(row)
+        else:
+            self.file.write(json.dumps({k: row.get(k) for k in self.fields}) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def reject_path_for(path):
+    base, ext = os.path.splitext(path)
+    return f"{base}.rejects{ext or '.jsonl'}"
+
+
+def batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_import(manager, path, reject_path=None):
+    # Existing rolls/emails are gathered in one pass; rows accepted from this
+    # file are added to the same sets, so duplicates across batches are caught too
+    if manager.preload:
+        rolls = set(manager.roll_index)
+        emails = set(manager.email_index)
+    else:
+        rolls, emails = set(), set()
+        for s in manager.iter_students():
+            rolls.add(s.student_roll)
+            emails.add(s.email.lower())
+
+    reject_path = reject_path or reject_path_for(path)
+    rejects = None
+    accepted = []
+    rejected = 0
+    line = 0
+    try:
+        for batch in batches(read_rows(path)):
+            rows = [clean_input(row) if row is not None else None for row in batch]
+            valid = [values for values in rows if values is not None]
+            columns = {field: [values[field] for values in valid] for field in FIELDS}
+            codes = iter(validate_columns(columns, rolls, emails))
+
+            for values in rows:
+                line += 1
+                if values is None:
+                    values, errors = dict.fromkeys(FIELDS, ""), ["Not a valid JSON object!"]
+                else:
+                    errors = [MESSAGES[code] for code in next(codes)]
+                if errors:
+                    if rejects is None:
+                        rejects = RowWriter(reject_path, FIELDS + ["line", "errors"])
+                    rejects.write({**values, "line": line, "errors": "; ".join(errors)})
+                    rejected += 1
+                    continue
+                student = Student.from_input(values)
+                rolls.add(student.student_roll)
+                emails.add(student.email)
+                accepted.append(student)
+    finally:
+        if rejects is not None:
+            rejects.close()
+
+    # manager.bulk_import holds the lock, so the checks above still stand
+    manager.add_students(accepted, checked=True)
+    return {"imported": len(accepted), "rejected": rejected, "rejects_file": reject_path if rejected else None}
+
+
+def export(manager, path):
+    writer = RowWriter(path, FIELDS)
+    count = 0
+    try:
+        for s in manager.iter_students():
+            writer.write(s.to_dict())
+            count += 1
+    finally:
+        writer.close()
+    return count
@@ -0,0 +1,169 @@
+import os
+import time
+import serializer
+from storage import StoreLock, fsync_dir
+
+# Change feed kept next to the store as <store>.changes: one JSON line per
+# mutation, numbered in the order they happened,
+#   {"seq": 41, "op": "update", "roll": 200124, "time": 1760792400.5, "record": {...}}
+# ("record" is left out for deletes). <store>.changes.lock holds the last
+# number given out, so numbers keep rising across processes and restarts.
+# Changes are logged before they are written to the store and marked as
+# written after; <store>.changes.applied holds the last one marked, so any a
+# crash left in between can be checked against the store (see
+# StudentManager.reconcile_feed).
+# Only the newest FEED_LIMIT changes are kept. Readers find where to start
+# with a binary search over the file, so reading the changes since some
+# number costs as much as the changes themselves, not the feed or roster.
+
+FEED_LIMIT = 100_000
+TRIM_EVERY = 1024  # changes between checks of the feed's length
+
+
+class FeedTrimmedError(Exception):
+    def __init__(self, since, first):
+        super().__init__(f"Changes after {since} are no longer kept (the feed starts at {first}). "
+                         f"Copy the whole roster again and continue from the latest sequence number.")
+        self.first = first
+
+
+class ChangeFeed:
+    def __init__(self, path, limit=FEED_LIMIT):
+        self.path = path
+        self.limit = limit
+        self.lock = StoreLock(path + ".lock")
+        # Only used for its counter: the number of the last change known to be in the store
+        self.applied = StoreLock(path + ".applied")
+        if not os.path.exists(self.applied.path):
+            with self.lock():
+                if not os.path.exists(self.applied.path):
+                    self.applied.bump(self.latest())  # a feed from before changes were marked
+
+    # entries are (op, roll, Student or None for a delete), in the order they
+    # happen; returns the first and last numbers given to them
+    def record(self, entries):
+        if not entries:
+            return None
+        now = round(time.time(), 3)
+        with self.lock():
+            # The numbers are taken before the lines are written: a crash in
+            # between leaves a gap in the sequence, never a number used twice
+            last = self.lock.bump(len(entries))
+            seq = last - len(entries)
+            lines = []
+            for op, roll, s in entries:
+                seq += 1
+                entry = {"seq": seq, "op": op, "roll": roll, "time": now}
+                if s is not None:
+                    entry["record"] = s.to_dict()
+                lines.append(serializer.dumps(entry) + "\n")
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.writelines(lines)
+            if (last - len(entries)) // TRIM_EVERY != last // TRIM_EVERY:
+                self.trim(last)
+        return last - len(entries) + 1, last
+
+    # Mark changes first..last as written to the store. The mark only moves on
+    # from the change before first, so changes whose write failed stay pending.
+    def mark_applied(self, first, last):
+        with self.lock():
+            done = self.applied.version()
+            if done == first - 1:
+                self.applied.bump(last - done)
+
+    # Whether any change logged is not marked as written yet; only takes the
+    # feed lock shared, so it is cheap to ask every time the store is opened
+    def behind(self):
+        with self.lock(exclusive=False):
+            return self.applied.version() < self.latest()
+
+    # The changes logged but not marked as written, as dicts, oldest first
+    def pending(self):
+        with self.lock():
+            done = self.applied.version()
+            if done >= self.latest():
+                return []
+            try:
+                return list(self.since(done))
+            except FeedTrimmedError as e:
+                return list(self.since(e.first - 1))
+
+    # Mark everything logged so far as written
+    def settle(self):
+        with self.lock():
+            done = self.applied.version()
+            latest = self.latest()
+            if latest > done:
+                self.applied.bump(latest - done)
+
+    # The number of the newest change (0 before the first)
+    def latest(self):
+        return self.lock.version()
+
+    # Drop the oldest changes beyond limit; the rest is copied aside and swapped in
+    def trim(self, last):
+        with open(self.path, "rb") as file:
+            first = line_at(file, 0)[1]
+            if first is None or last - first < self.limit:
+                return
+            file.seek(offset_after(file, last - self.limit))
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as out:
+                for line in file:
+                    out.write(line)
+                out.flush()
+                os.fsync(out.fileno())
+        os.replace(tmp, self.path)
+        fsync_dir(self.path)
+
+    # The feed's lines (bytes, JSON) for every change after seq, oldest first.
+    # No lock is needed: lines are only appended, and a trim swaps in a new file.
+    def lines(self, seq):
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            first = line_at(file, 0)[1]
+            if first is not None and seq < first - 1:
+                raise FeedTrimmedError(seq, first)
+            file.seek(offset_after(file, seq))
+            for line in file:
+                if not line.endswith(b"\n"):
+                    return  # still being written
+                yield line
+
+    def since(self, seq):
+        for line in self.lines(seq):
+            yield serializer.loads(line)
+
+    def close(self):
+        self.lock.close()
+        self.applied.close()
+
+
+# (start, seq) of the first whole line starting at or after position; seq is None at the end
+def line_at(file, position):
+    if position:
+        file.seek(position - 1)
+        file.readline()
+    else:
+        file.seek(0)
+    start = file.tell()
+    line = file.readline()
+    if not line.endswith(b"\n"):
+        return start, None
+    return start, serializer.loads(line)["seq"]
+
+
+# Where the first line with a sequence number above seq starts
+def offset_after(file, seq):
+    low, high = 0, os.fstat(file.fileno()).st_size
+    while low < high:
+        middle = (low + high) // 2
+        found = line_at(file, middle)[1]
+        if found is not None and found <= seq:
+            low = middle + 1
+        else:
+            high = middle
+    return line_at(file, low)[0]
@@ -0,0 +1,127 @@
+from array import array
+from models import Student, dept_name, semester_number
+
+
+# Column-per-field storage for very large rosters. Numeric fields live in typed
+# arrays, dept strings are interned, and StudentView gives each row the same
+# attribute API as Student without allocating a full object per record.
+# Only benchmarks/bench_memory.py uses it for now: StudentManager and the
+# backends still hold Student objects, since the indexes and the in-place
+# updates of merge_changes/set_fields rely on them.
+class StudentColumns:
+    def __init__(self):
+        self.rolls = array("i")
+        self.cgpas = array("d")
+        self.semesters = array("b")
+        self.names = []
+        self.emails = []
+        self.depts = []
+        self.phones = []
+
+    @classmethod
+    def from_students(cls, students):
+        columns = cls()
+        for s in students:
+            columns.append(s)
+        return columns
+
+    def append(self, student):
+        self.rolls.append(student.student_roll)
+        self.cgpas.append(float(student.cgpa))
+        self.semesters.append(student.semester)
+        self.names.append(student.name)
+        self.emails.append(student.email)
+        self.depts.append(student.dept)
+        self.phones.append(student.phone)
+
+    # Removing a row shifts every later row down, so views taken before a pop are stale
+    def pop(self, index):
+        for column in (self.rolls, self.cgpas, self.semesters, self.names, self.emails, self.depts, self.phones):
+            del column[index]
+
+    def __len__(self):
+        return len(self.rolls)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("student index out of range")
+        return StudentView(self, index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield StudentView(self, index)
+
+    def to_student(self, index):
+        return Student(
+            self.names[index], self.rolls[index], self.cgpas[index], self.emails[index],
+            self.depts[index], self.semesters[index], self.phones[index]
+        )
+
+
+class StudentView:
+    __slots__ = ("columns", "index")
+
+    def __init__(self, columns, index):
+        self.columns = columns
+        self.index = index
+
+    @property
+    def name(self):
+        return self.columns.names[self.index]
+
+    @name.setter
+    def name(self, value):
+        self.columns.names[self.index] = value
+
+    @property
+    def student_roll(self):
+        return self.columns.rolls[self.index]
+
+    @student_roll.setter
+    def student_roll(self, value):
+        self.columns.rolls[self.index] = value
+
+    @property
+    def cgpa(self):
+        return self.columns.cgpas[self.index]
+
+    @cgpa.setter
+    def cgpa(self, value):
+        self.columns.cgpas[self.index] = float(value)
+
+    @property
+    def email(self):
+        return self.columns.emails[self.index]
+
+    @email.setter
+    def email(self, value):
+        self.columns.emails[self.index] = value
+
+    @property
+    def dept(self):
+        return self.columns.depts[self.index]
+
+    @dept.setter
+    def dept(self, value):
+        self.columns.depts[self.index] = dept_name(value)
+
+    @property
+    def semester(self):
+        return self.columns.semesters[self.index]
+
+    @semester.setter
+    def semester(self, value):
+        self.columns.semesters[self.index] = semester_number(value)
+
+    @property
+    def phone(self):
+        return self.columns.phones[self.index]
+
+    @phone.setter
+    def phone(self, value):
+        self.columns.phones[self.index] = value
+
+    def to_dict(self):
+        return self.columns.to_student(self.index).to_dict()
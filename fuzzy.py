@@ -0,0 +1,198 @@
+import unicodedata
+
+# Typo-tolerant name search. Names are normalised and split into words. Each
+# distinct word sits once in a BK-tree, which finds the words within a small
+# edit distance of a query word without comparing against every word, and in
+# a phonetic index (Soundex), which catches spellings that sound alike but
+# differ by more letters ("hossain" / "hosen"). Both hold words, not
+# students, so a query costs roughly the size of the vocabulary it has to
+# search, not the roster.
+
+# Left off the front of names: "Md", "Mst" and the spellings they abbreviate
+TITLES = {"md", "mohd", "mohammad", "mohammed", "muhammad", "muhammed", "mohamed", "mst", "mosammat", "mt"}
+SOUNDEX = {letter: str(code) for code, letters in enumerate(("aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r")) for letter in letters}
+
+
+def normalise(name):
+    # Lower case, accents and punctuation dropped, leading titles removed
+    text = unicodedata.normalize("NFKD", name.lower())
+    text = "".join(c if c.isalpha() else " " for c in text if not unicodedata.combining(c))
+    words = text.split()
+    while len(words) > 1 and words[0] in TITLES:
+        words.pop(0)
+    return words
+
+
+# Edit distance allowed for a query word of this length
+def tolerance(word):
+    return 0 if len(word) <= 2 else 1 if len(word) <= 5 else 2
+
+
+def levenshtein(a, b, limit=None):
+    # Insertions, deletions and substitutions; with a limit, any distance over
+    # it comes back as limit + 1 as soon as that is certain
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if limit is not None and min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def soundex(word):
+    codes = [SOUNDEX.get(c, "") for c in word]
+    key = [word[0]]
+    last = codes[0]
+    for c, code in zip(word[1:], codes[1:]):
+        if code and code != "0" and code != last:
+            key.append(code)
+        if c not in "hw":  # h and w don't separate letters with the same code
+            last = code
+    return "".join(key)[:4].ljust(4, "0")
+
+
+# Metric tree over words: each child hangs off its parent at its distance from
+# it, so by the triangle inequality a search within k of the query only has to
+# visit the children at distance d - k .. d + k of every node it looks at
+class BKTree:
+    def __init__(self):
+        self.root = None  # [word, {distance: child node}]
+        self.size = 0
+
+    def add(self, word):
+        if self.root is None:
+            self.root = [word, {}]
+            self.size = 1
+            return
+        node = self.root
+        while True:
+            d = levenshtein(word, node[0])
+            if d == 0:
+                return
+            child = node[1].get(d)
+            if child is None:
+                node[1][d] = [word, {}]
+                self.size += 1
+                return
+            node = child
+
+    # (distance, word) for every word within k of word
+    def search(self, word, k):
+        found = []
+        stack = [self.root] if self.root is not None else []
+        while stack:
+            text, children = stack.pop()
+            d = levenshtein(word, text)
+            if d <= k:
+                found.append((d, text))
+            for distance in range(max(1, d - k), d + k + 1):
+                child = children.get(distance)
+                if child is not None:
+                    stack.append(child)
+        return found
+
+
+# Rolls by the words of their names, searchable by spelling and by sound.
+# Kept up to date with add/remove; words nobody has any more stay in the tree
+# (it can't drop a node) and are skipped, and rebuild() clears them once they
+# are half of it.
+class FuzzyIndex:
+    def __init__(self):
+        self.names = {}  # roll -> normalised words
+        self.rolls = {}  # word -> rolls whose name has it
+        self.sounds = {}  # Soundex key -> words
+        self.tree = BKTree()
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, key, name):
+        if key in self.names:
+            self.remove(key)
+        words = normalise(name)
+        self.names[key] = words
+        for word in words:
+            rolls = self.rolls.get(word)
+            if rolls is None:
+                rolls = self.rolls[word] = set()
+                self.tree.add(word)
+                self.sounds.setdefault(soundex(word), set()).add(word)
+            rolls.add(key)
+
+    def remove(self, key):
+        words = self.names.pop(key, None)
+        for word in words or ():
+            rolls = self.rolls[word]
+            rolls.discard(key)
+            if not rolls:
+                del self.rolls[word]
+        if self.tree.size > 1024 and len(self.rolls) * 2 < self.tree.size:
+            self.rebuild()
+
+    def rebuild(self):
+        self.tree = BKTree()
+        self.sounds = {}
+        for word in self.rolls:
+            self.tree.add(word)
+            self.sounds.setdefault(soundex(word), set()).add(word)
+
+    # word -> its distance from query word, for the words spelled or sounding like it
+    def similar_words(self, word):
+        found = {text: d for d, text in self.tree.search(word, tolerance(word)) if text in self.rolls}
+        for text in self.sounds.get(soundex(word), ()):
+            if text in self.rolls and text not in found:
+                found[text] = levenshtein(word, text)
+        return found
+
+    # (roll, distance) for names with a word like some word of the query,
+    # closest first. A query word counts its distance to the name's nearest
+    # similar word, or its whole length if the name has none. Ties go to the
+    # name nearest the query's length, then to the lower roll.
+    def search(self, name, limit=None):
+        words = normalise(name)
+        matches = []  # per query word: roll -> distance of its best match
+        for word in words:
+            scores = {}
+            for text, d in self.similar_words(word).items():
+                for roll in self.rolls[text]:
+                    if d < scores.get(roll, d + 1):
+                        scores[roll] = d
+            matches.append(scores)
+        found = set().union(*matches)
+        length = len(" ".join(words))
+        ranked = []
+        for roll in found:
+            total = sum(scores.get(roll, len(word)) for word, scores in zip(words, matches))
+            ranked.append((total, abs(len(" ".join(self.names[roll])) - length), roll))
+        ranked.sort()
+        return [(roll, total) for total, _, roll in ranked[:limit]]
+
+
+# The same ranking by comparing the query with every name (for checking and benchmarks)
+def brute_force(names, name, limit=None):
+    words = normalise(name)
+    if not words:
+        return []
+    found = []
+    for roll, text in names.items():
+        name_words = normalise(text)
+        total = 0
+        matched = False
+        for word in words:
+            k = tolerance(word)
+            key = soundex(word)
+            distances = [d for d in (levenshtein(word, w) for w in name_words) if d <= k]
+            distances += [levenshtein(word, w) for w in name_words if soundex(w) == key]
+            matched = matched or bool(distances)
+            total += min(distances, default=len(word))
+        if matched:
+            found.append((total, abs(len(" ".join(name_words)) - len(" ".join(words))), roll))
+    found.sort()
+    return [(roll, total) for total, _, roll in found[:limit]]
@@ -1,14 +1,34 @@
-from manager import StudentManager
+import argparse
+import sys
 
-def main():
-    CYAN = "\033[36m"
-    YELLOW = "\033[33m"
-    RESET = "\033[0m"
-    RED = "\033[31m"
+# Only argparse is imported up front: the manager, storage backends and json are
+# imported when a command needs them, so one-shot commands start quickly.
+
+CYAN = "\033[36m"
+YELLOW = "\033[33m"
+RESET = "\033[0m"
+RED = "\033[31m"
+
+FIELD_OPTIONS = ("name", "cgpa", "email", "dept", "semester", "phone")
+
+def open_manager(args, preload=None):
+    from manager import StudentManager
+    from storage import CorruptDatabaseError
+    options = {"snapshot_format": args.snapshot_format, "shard_by": args.shard_by}
+    try:
+        return StudentManager(args.db, preload=preload, **options)
+    except CorruptDatabaseError as e:
+        print(f"{RED}Error: {e} Restore a backup before continuing.{RESET}", file=sys.stderr)
+        return None
+
+def interactive(args):
     print("\n=== STUDENT MANAGEMENT SYSTEM ===")
     print(f"{RED}Make Full Screen for Better Experience!{RESET}")
 
-    manager = StudentManager()
+    # --lazy streams records from disk on demand instead of loading the roster up front
+    manager = open_manager(args, preload=False if args.lazy else None)
+    if manager is None:
+        return 1
     menu_options = {
         '1': manager.add_student,
         '2': manager.view_all,
@@ -24,15 +44,341 @@ def main():
         print(f"{CYAN}1. Add Student\n2. View All Student\n3. Search Student\n4. Delete Student\n5. Update Student\n6. Exit{RESET}")
         print("=" * 34)
         choice = input("Select an option: ")
-        
+
         action = menu_options.get(choice)
         if action:
+            # Pick up what other users of the same file changed in the meantime
+            manager.refresh()
             if choice == '6':
                 print("Thank you for using the Student Record Management System. Goodbye!")
+                manager.close()
                 action()
             action()
         else:
             print("Invalid choice.")
 
+def row_text(s):
+    from models import semester_label
+    return f"{s.student_roll} | {s.name} | {s.dept} | {s.email} | {s.cgpa} | {semester_label(s.semester)} | {s.phone}"
+
+def group_text(key):
+    # Semester groups are numbers, labelled here for display
+    from models import semester_label
+    if isinstance(key, tuple):
+        return " / ".join(map(group_text, key))
+    return semester_label(key) if isinstance(key, int) else key
+
+def show(args, students):
+    if args.json:
+        import json
+        print(json.dumps([s.to_dict() for s in students], indent=2))
+        return
+    if not students:
+        print("No records found.")
+        return
+    print("\n".join(map(row_text, students)))
+
+def show_one(args, student, action):
+    if student is None:
+        print(f"Error: Student {args.roll} not found.", file=sys.stderr)
+        return 1
+    if args.json:
+        show(args, [student])
+    else:
+        print(f"{action}: {row_text(student)}")
+    return 0
+
+# Each command opens the store without preloading it, so a single lookup or
+# change reads only what it needs and a JSON store appends to its journal.
+def run(args, command):
+    from storage import CorruptDatabaseError
+    from validations import MESSAGES, ValidationError
+    manager = open_manager(args, preload=False)
+    if manager is None:
+        return 1
+    try:
+        return command(args, manager)
+    except ValidationError as e:
+        for code in e.codes:
+            print(f"Error: {MESSAGES[code]}", file=sys.stderr)
+        return 1
+    except CorruptDatabaseError as e:
+        # Without a preloaded roster the snapshot is only read once a command needs it
+        print(f"{RED}Error: {e} Restore a backup before continuing.{RESET}", file=sys.stderr)
+        return 1
+    finally:
+        manager.close()
+
+def add_command(args, manager):
+    student = manager.create_student(args.name, args.roll, args.cgpa, args.email, args.dept, args.semester, args.phone)
+    return show_one(args, student, "Added")
+
+def get_command(args, manager):
+    return show_one(args, manager.get_student(args.roll), "Found")
+
+def search_command(args, manager):
+    if args.fuzzy and args.name is not None:
+        results = manager.find_similar_names(args.name, args.limit or 10)
+    else:
+        results = manager.find_students(roll=args.roll, name=args.name, email=args.email, limit=args.limit)
+    show(args, results)
+    return 0 if results else 1
+
+def delete_command(args, manager):
+    return show_one(args, manager.remove_student(args.roll), "Deleted")
+
+def update_command(args, manager):
+    changes = {field: getattr(args, field) for field in FIELD_OPTIONS}
+    return show_one(args, manager.modify_student(args.roll, **changes), "Updated")
+
+def list_command(args, manager):
+    offset = (args.page - 1) * args.page_size if args.page else 0
+    limit = args.page_size if args.page else None
+    show(args, manager.list_students(offset, limit, args.roll_from, args.roll_to))
+    return 0
+
+def stats_command(args, manager):
+    report = manager.cgpa_stats(args.by)
+    if args.perf:
+        # Opening the store and computing the figures above were measured (main enabled it)
+        import perf
+        print(perf.format_report(perf.report()), file=sys.stderr)
+    if args.json:
+        import json
+        groups = [{"group": key, **values} for key, values in report.items()]
+        print(json.dumps(groups, indent=2))
+        return 0
+    if not report:
+        print("No records found.")
+        return 0
+    labels = list(next(iter(report.values()))["histogram"])
+    print(f"{'Group':<45} {'Count':>6} {'Mean':>6} {'Median':>6} {'P25':>6} {'P75':>6} {'P90':>6}  Histogram ({', '.join(labels)})")
+    for key, values in report.items():
+        group = group_text(key)
+        p25, p75, p90 = (values[p] for p in ("p25", "p75", "p90"))
+        histogram = " ".join(str(n) for n in values["histogram"].values())
+        print(f"{group:<45} {values['count']:>6} {values['mean']:>6.2f} {values['median']:>6.2f} {p25:>6.2f} {p75:>6.2f} {p90:>6.2f}  {histogram}")
+    return 0
+
+def top_command(args, manager):
+    show(args, manager.top_students(args.k, args.dept, args.semester))
+    return 0
+
+def rank_command(args, manager):
+    result = manager.rank_of(args.roll, args.within)
+    if result is None:
+        print(f"Error: Student {args.roll} not found.", file=sys.stderr)
+        return 1
+    if args.json:
+        import json
+        print(json.dumps(result))
+    else:
+        group = f"in {args.within}" if args.within else "overall"
+        print(f"Roll {args.roll} is ranked {result['rank']} of {result['of']} {group}, ahead of {result['percentile']}%.")
+    return 0
+
+def query_command(args, manager):
+    from query import QueryError, parse_query, run_query
+    try:
+        results, explain = run_query(manager, parse_query(args.query), args.limit)
+    except QueryError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    show(args, results)
+    if args.explain:
+        import json
+        print(json.dumps(explain, indent=2), file=sys.stderr)
+    return 0 if results else 1
+
+def import_command(args, manager):
+    try:
+        result = manager.bulk_import(args.file, args.rejects)
+    except OSError as e:
+        print(f"Error: Could not import {args.file}: {e.strerror or e}", file=sys.stderr)
+        return 1
+    if args.json:
+        import json
+        print(json.dumps(result))
+        return 0
+    print(f"Imported {result['imported']} students, rejected {result['rejected']}.")
+    if result["rejects_file"]:
+        print(f"Rejected rows and their errors were written to {result['rejects_file']}")
+    return 0
+
+def promote_command(args, manager):
+    result = manager.promote_students(args.dept)
+    if args.json:
+        import json
+        print(json.dumps(result))
+        return 0
+    print(f"Promoted {result['promoted']} students to the next semester.")
+    if result["in_last_semester"]:
+        print(f"{result['in_last_semester']} students in the 8th semester were left as they are.")
+    return 0
+
+# JSON Lines on stdout, one per change, straight from the feed file
+def changes_command(args, manager):
+    from changefeed import FeedTrimmedError
+    if args.latest:
+        print(manager.feed.latest())
+        return 0
+    try:
+        for line in manager.feed.lines(args.since):
+            sys.stdout.buffer.write(line)
+    except FeedTrimmedError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+def export_command(args, manager):
+    count = manager.export(args.file)
+    print(f"Exported {count} students to {args.file}")
+    return 0
+
+# The server holds the roster in memory for its whole run
+def serve(args):
+    manager = open_manager(args)
+    if manager is None:
+        return 1
+    from server import serve
+    try:
+        serve(manager, args.host, args.port)
+    finally:
+        manager.close()
+    return 0
+
+# Copies a whole store into a new file of another format; --db isn't used
+def convert(args):
+    from backends import convert_store
+    try:
+        count = convert_store(args.source, args.target, shard_by=args.shard_by)
+    except FileExistsError as e:
+        print(f"Error: {e}.", file=sys.stderr)
+        return 1
+    print(f"Copied {count} students from {args.source} to {args.target}.")
+    return 0
+
+# argparse type for counts and page numbers: a whole number from 1 up
+def positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{text!r} is not a whole number")
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, not {value}")
+    return value
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Student Record Management System. Run without a command for the interactive menu.", allow_abbrev=False)
+    parser.add_argument("--db", default="students_db.json", help="database file (.json, .bin for the binary record file, .db for SQLite, or a .shards folder)")
+    parser.add_argument("--lazy", action="store_true", help="interactive menu: read records from disk on demand")
+    parser.add_argument("--snapshot-format", choices=["compact", "pretty", "gzip"],
+                        help="how a JSON database is written: one record per line (default), indented, or gzipped")
+    parser.add_argument("--shard-by", choices=["dept", "roll"],
+                        help="how a new .shards database splits students into files: by dept (default) or by roll range")
+    parser.add_argument("--perf-log", metavar="FILE", help="measure timings and counters and append them to FILE as JSON lines")
+    parser.add_argument("--perf-prom", metavar="FILE", help="measure timings and counters and write them to FILE in Prometheus text format")
+    commands = parser.add_subparsers(dest="command")
+
+    def command(name, handler, help):
+        sub = commands.add_parser(name, help=help)
+        sub.add_argument("--json", action="store_true", help="print results as JSON")
+        sub.set_defaults(handler=handler)
+        return sub
+
+    add = command("add", add_command, "add a student")
+    add.add_argument("--roll", required=True)
+    for field in FIELD_OPTIONS:
+        add.add_argument(f"--{field}", required=True)
+
+    get = command("get", get_command, "show the student with a roll")
+    get.add_argument("--roll", required=True, type=int)
+
+    search = command("search", search_command, "find students by roll, email or part of the name")
+    by = search.add_mutually_exclusive_group(required=True)
+    by.add_argument("--roll", type=int)
+    by.add_argument("--name")
+    by.add_argument("--email")
+    search.add_argument("--limit", type=positive_int, help="show at most this many name matches")
+    search.add_argument("--fuzzy", action="store_true", help="with --name: names spelled or sounding alike, closest first (10 unless --limit)")
+
+    delete = command("delete", delete_command, "delete the student with a roll (no confirmation)")
+    delete.add_argument("--roll", required=True, type=int)
+
+    update = command("update", update_command, "change some fields of a student")
+    update.add_argument("--roll", required=True, type=int)
+    for field in FIELD_OPTIONS:
+        update.add_argument(f"--{field}")
+
+    listing = command("list", list_command, "list students by roll")
+    listing.add_argument("--page", type=positive_int, help="show only this page (from 1)")
+    listing.add_argument("--page-size", type=positive_int, default=50)
+    listing.add_argument("--from", dest="roll_from", type=int, help="first roll to include")
+    listing.add_argument("--to", dest="roll_to", type=int, help="last roll to include")
+    stats = command("stats", stats_command, "CGPA count, mean, median, percentiles and histogram")
+    stats.add_argument("--by", choices=["dept", "semester", "dept,semester"], help="group the figures")
+    stats.add_argument("--perf", action="store_true", help="also print call timings and counters for this run (to stderr)")
+
+    top = command("top", top_command, "students with the highest CGPA")
+    top.add_argument("--k", type=positive_int, default=10, help="how many (default 10)")
+    top.add_argument("--dept")
+    top.add_argument("--semester", help="e.g. 5 or 5th")
+
+    rank = command("rank", rank_command, "CGPA rank and percentile of a student")
+    rank.add_argument("--roll", required=True, type=int)
+    rank.add_argument("--within", choices=["dept", "semester", "dept,semester"], help="rank only against the student's own group")
+
+    query = command("query", query_command, "find students matching several conditions")
+    query.add_argument("query", help='e.g. \'dept == "CSE" and semester in {"3rd", "4th"} and cgpa >= 3.5 and name contains "hasan"\'')
+    query.add_argument("--limit", type=positive_int, help="show at most this many matches")
+    query.add_argument("--explain", action="store_true", help="also print the query plan and rows examined (to stderr)")
+
+    importer = command("import", import_command, "add students from a CSV or JSON Lines file")
+    importer.add_argument("file")
+    importer.add_argument("--rejects", help="where to write rejected rows (default: <file>.rejects.<ext>)")
+
+    promote = command("promote", promote_command, "move every student up one semester, saved as one change")
+    promote.add_argument("--dept", help="only students of this dept")
+
+    feed = command("changes", changes_command, "print the adds, updates and deletes made after a sequence number, as JSON Lines")
+    feed.add_argument("--since", type=int, default=0, help="the last sequence number already seen (default 0: every change kept)")
+    feed.add_argument("--latest", action="store_true", help="only print the newest sequence number")
+
+    exporter = command("export", export_command, "write all students to a CSV or JSON Lines file")
+    exporter.add_argument("file")
+    converter = command("convert", convert, "copy a database into a new .json, .bin or .db file or .shards folder")
+    converter.add_argument("source")
+    converter.add_argument("target")
+    server = command("serve", serve, "run an HTTP/JSON service over the database")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8000)
+    return parser
+
+# Instrumentation stays off (and costs nothing) unless one of the perf options is given
+def start_perf(args):
+    if not (args.perf_log or args.perf_prom or getattr(args, "perf", False)):
+        return None
+    import perf
+    sinks = []
+    if args.perf_log:
+        sinks.append(perf.LogSink(args.perf_log))
+    if args.perf_prom:
+        sinks.append(perf.PrometheusSink(args.perf_prom))
+    perf.enable(*sinks)
+    return perf
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    perf = start_perf(args)
+    try:
+        if args.command is None:
+            return interactive(args)
+        if args.command in ("serve", "convert"):
+            return args.handler(args)
+        return run(args, args.handler)
+    finally:
+        if perf is not None:
+            perf.emit()
+
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
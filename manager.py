@@ -1,31 +1,562 @@
-import os
-import json
-from models import Student
-from validations import validate_cgpa, validate_email, validate_name, validate_phone, validate_roll, validate_semester, validate_dept
+import sys
+from contextlib import contextmanager
+import perf
+from backends import BackendLookup, JsonBackend, open_backend
+from models import Student, dept_key, dept_name, find_dept, semester_label, semester_number
+from storage import ConflictError
+from validations import ValidationError, clean_input, validate_cgpa, validate_columns, validate_email, validate_name, validate_phone, validate_roll, validate_semester, validate_dept
+
+PAGE_SIZE = 50  # rows per page in view_all
+LAST_SEMESTER = 8
 
 class StudentManager:
-    def __init__(self, filename="students_db.json"):
+    def __init__(self, filename="students_db.json", backend=None, preload=None, **options):
+        from changefeed import ChangeFeed
         self.filename = filename
+        self.backend = backend or open_backend(filename, **options)
+        # Every change made through the methods below is also numbered and logged here
+        self.feed = ChangeFeed(self.backend.filename.rstrip("/") + ".changes")
+        self.preload = self.backend.preload if preload is None else preload
         self.students = self.load_data()
+        self.build_indexes()
+        self.reconcile_feed()
 
     def load_data(self):
-        if not os.path.exists(self.filename):
-            return []
-        try:
-            with open(self.filename, "r") as file:
-                data = json.load(file)
-                return [Student(
-                    s['name'],s['roll'],s['cgpa'],s['email'],s['dept'],s['semester'],s['phone']
-                ) for s in data]
-        except (json.JSONDecodeError, IOError):
-            return []
+        return self.backend.load() if self.preload else []
 
+    # Without a preloaded roster self.students is an empty placeholder, and every
+    # change was already written by the backend; it only needs making durable
     def save_data(self):
+        if not self.preload:
+            self.backend.sync()
+            return True
+        with self.backend.lock():
+            self.refresh()
+            return self.backend.save_all(self.students)
+
+    def compact(self):
+        if isinstance(self.backend, JsonBackend):
+            with self.backend.lock():
+                self.refresh()
+                self.backend.compact()
+
+    # A preloaded roster is caught up and may be folded back into the store,
+    # which needs the exclusive lock; without one nothing is written here
+    def close(self):
+        if self.preload:
+            with self.backend.lock():
+                self.refresh()
+                self.backend.close()
+        else:
+            self.backend.close()
+        self.feed.close()
+
+    # Bring the roster up to date with what other processes wrote to the store.
+    # Only the changed records are touched, and unchanged objects stay valid.
+    def refresh(self):
+        if not self.preload:
+            return
+        self.merge_changes(self.backend.changes())
+
+    # Apply {roll: Student, or None if deleted} to the roster and indexes.
+    # Past a tenth of the roster, rebuilding the indexes once is quicker than
+    # updating them student by student.
+    def merge_changes(self, changes):
+        if len(changes) * 10 > len(self.students):
+            roster = {s.student_roll: s for s in self.students}
+            for roll, fresh in changes.items():
+                current = roster.get(roll)
+                if fresh is None:
+                    roster.pop(roll, None)
+                elif current is None:
+                    roster[roll] = fresh
+                else:
+                    for field in Student.__slots__:
+                        setattr(current, field, getattr(fresh, field))
+            self.students[:] = roster.values()  # the backend holds the same list
+            self.build_indexes()
+            return
+        for roll, fresh in changes.items():
+            current = self.roll_index.get(roll)
+            if current is None and fresh is not None:
+                self.students.append(fresh)
+                self.index_student(fresh)
+            elif current is not None and fresh is None:
+                self.students.remove(current)
+                self.unindex_student(current)
+            elif current is not None:
+                self.set_fields(current, fresh)
+
+    # Indexes: roll -> Student, lower-cased email -> Student, name trigrams, rolls
+    # in order, the CGPA statistics and the CGPA ranking.
+    # Without a preloaded roster roll/email read through to the backend instead,
+    # and there is nothing in memory to keep up to date. The index modules are
+    # only imported here, so commands that don't preload never load them.
+    def build_indexes(self):
+        if not self.preload:
+            self.roll_index = BackendLookup(self.backend.get)
+            self.email_index = BackendLookup(self.backend.get_by_email)
+            self.name_index = None
+            self.fuzzy_index = None
+            self.roll_order = None
+            self.stats = None
+            self.ranks = None
+            return
+        from ngram import TrigramIndex
+        from ranking import RankIndex
+        from sorted_index import SortedIndex
+        from stats import StatsEngine
+        self.roll_index = {}
+        self.email_index = {}
+        self.name_index = TrigramIndex()
+        self.fuzzy_index = None  # built by the first find_similar_names
+        for s in self.students:
+            self.index_student(s, bulk=True)
+        self.roll_order = SortedIndex(self.roll_index)
+        self.stats = StatsEngine.from_students(self.students)
+        self.ranks = RankIndex.from_students(self.students)
+
+    # bulk=True skips the sorted structures, which the caller rebuilds once for the batch
+    def index_student(self, student, bulk=False):
+        if not self.preload:
+            return
+        self.roll_index[student.student_roll] = student
+        self.email_index[student.email.lower()] = student
+        self.name_index.add(student.student_roll, student.name.lower())
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.add(student.student_roll, student.name)
+        if not bulk:
+            self.roll_order.add(student.student_roll)
+            self.stats.add(student)
+            self.ranks.add(student)
+
+    def unindex_student(self, student):
+        if not self.preload:
+            return
+        self.roll_index.pop(student.student_roll, None)
+        # When emails are swapped or reused in one batch, another student may
+        # already hold this one's old email; that entry stays
+        email = student.email.lower()
+        if self.email_index.get(email) is student:
+            del self.email_index[email]
+        self.name_index.remove(student.student_roll)
+        if self.fuzzy_index is not None:
+            self.fuzzy_index.remove(student.student_roll)
+        self.roll_order.remove(student.student_roll)
+        self.stats.remove(student)
+        self.ranks.remove(student)
+
+    def set_fields(self, student, source):
+        self.unindex_student(student)
+        for field in Student.__slots__:
+            setattr(student, field, getattr(source, field))
+        self.index_student(student)
+
+    # Every mutation goes through these three, which keep the roster, the
+    # indexes and the backend in step. Each holds the store lock and first
+    # catches up with other processes, so nothing they wrote is overwritten.
+    # checked=True when the caller already validated the roll and email under this lock
+    def insert_student(self, student, checked=False):
+        with self.backend.lock():
+            self.refresh()
+            codes = []
+            if not checked and student.student_roll in self.roll_index:
+                codes.append("ROLL_EXISTS")
+            if not checked and student.email.lower() in self.email_index:
+                codes.append("EMAIL_EXISTS")
+            if codes:
+                raise ValidationError(codes)
+            with self.logged([("insert", student.student_roll, student)]):
+                if self.preload:
+                    self.students.append(student)
+                self.index_student(student)
+                self.backend.insert(student)
+
+    # expected is the student's to_dict() as it was read before the edit; if
+    # someone has changed or deleted it since, ConflictError is raised instead
+    def apply_update(self, student, updated, expected=None):
+        with self.backend.lock():
+            self.refresh()
+            self.check_unchanged(student, expected)
+            email = updated.email.lower()
+            if email != student.email.lower() and email in self.email_index:
+                raise ValidationError(["EMAIL_EXISTS"])
+            with self.logged([("update", student.student_roll, updated)]):
+                self.set_fields(student, updated)
+                self.backend.update(student)
+
+    def drop_student(self, student, expected=None):
+        with self.backend.lock():
+            self.refresh()
+            self.check_unchanged(student, expected)
+            with self.logged([("delete", student.student_roll, None)]):
+                if self.preload:
+                    self.students.remove(student)
+                self.unindex_student(student)
+                self.backend.delete(student)
+
+    # A transaction's changes, {roll: Student, or None to delete}, already
+    # validated together: applied to the roster and committed by the backend in
+    # one write. If the write fails the roster is put back as it was.
+    # added holds the rolls that are new to the roster.
+    def commit_changes(self, changes, added=()):
+        ops = [("delete" if s is None else "insert" if roll in added else "update", roll, s) for roll, s in changes.items()]
+        with self.backend.lock(), self.logged(ops):
+            if self.preload:
+                previous = {roll: s.copy() if s is not None else None for roll, s in ((roll, self.roll_index.get(roll)) for roll in changes)}
+                self.merge_changes(changes)
+            try:
+                self.backend.apply_changes(changes)
+            except Exception:
+                if self.preload:
+                    self.merge_changes(previous)
+                raise
+
+    # Changes are logged to the feed before the backend writes them and marked
+    # as written after, so a crash can't lose a feed entry for a change that
+    # was made. If the write raises, the stored version of those rolls is
+    # logged straight away (see undo_feed); one that never finishes stays
+    # unmarked and is put right by reconcile_feed the next time the store is opened.
+    @contextmanager
+    def logged(self, entries):
+        numbers = self.feed.record(entries)
+        try:
+            yield
+        except Exception:
+            self.undo_feed(entries, numbers[0])
+            raise
+        self.feed.mark_applied(*numbers)
+
+    # The write of entries (logged from number first on) failed: log what the
+    # store holds for their rolls now, so feed readers don't keep a change
+    # that never happened. Called with the store lock held.
+    def undo_feed(self, entries, first):
+        logged = {roll: s.to_dict() if s is not None else None for _, roll, s in entries}
         try:
-            with open(self.filename, "w") as file:
-                json.dump([s.to_dict() for s in self.students], file, indent=4)
-        except IOError as e:
-            print(f"Error saving data: {e}")
+            # Read from the store itself: the roster may still hold the failed change
+            stored = {s.student_roll: s for s in self.backend.scan() if s.student_roll in logged}
+            self.correct_feed(logged, stored)
+            self.feed.mark_applied(first, self.feed.latest())
+        except Exception:
+            pass  # the store can't be read either; reconcile_feed sorts it out on the next open
+
+    # Compare the rolls of unmarked feed entries with the store, and log the
+    # store's version again for any whose change never made it there. The
+    # exclusive lock is only taken when there are such entries, so opening the
+    # store for reading doesn't queue behind writers.
+    def reconcile_feed(self):
+        with self.backend.lock(exclusive=False):
+            if not self.feed.behind():
+                return
+        with self.backend.lock():
+            pending = self.feed.pending()
+            if not pending:
+                return
+            self.refresh()
+            self.correct_feed({entry["roll"]: entry.get("record") for entry in pending}, self.roll_index)
+            self.feed.settle()
+
+    # logged maps roll -> the record the feed ends with (None once deleted);
+    # stored looks a roll up in the store. Rolls that differ are logged again.
+    def correct_feed(self, logged, stored):
+        fixes = []
+        for roll, record in logged.items():
+            s = stored.get(roll)
+            if s is None and record is not None:
+                fixes.append(("delete", roll, None))
+            elif s is not None and record is None:
+                fixes.append(("insert", roll, s))
+            elif s is not None and s.to_dict() != record:
+                fixes.append(("update", roll, s))
+        self.feed.record(fixes)
+
+    # Raises ConflictError if someone else deleted the student, or changed it from
+    # expected (its to_dict() when the caller read it), in the meantime
+    def check_unchanged(self, student, expected):
+        if expected is None and not self.preload:
+            return  # nothing is held in memory that could have gone stale
+        current = self.roll_index.get(student.student_roll)
+        gone = current is None or self.preload and current is not student
+        if gone or expected is not None and current.to_dict() != expected:
+            raise ConflictError(f"Student {student.student_roll} was changed or deleted by someone else since it was read. Look it up again and retry.")
+
+    # Add already-validated students and persist them as one batch. Like
+    # insert_student, their rolls and emails are checked under the lock against
+    # what other processes have written, and against each other; if any clash,
+    # TransactionError names them and nothing is added.
+    # checked=True when the caller already did that under this lock
+    def add_students(self, students, checked=False):
+        if not students:
+            return
+        with self.backend.lock():
+            self.refresh()
+            if not checked:
+                self.check_new(students)
+            with self.logged([("insert", s.student_roll, s) for s in students]):
+                if self.preload:
+                    from ranking import RankIndex
+                    from stats import StatsEngine
+                    self.students.extend(students)
+                    for s in students:
+                        self.index_student(s, bulk=True)
+                    self.roll_order.add_many(s.student_roll for s in students)
+                    self.stats = StatsEngine.from_students(self.students)
+                    self.ranks = RankIndex.from_students(self.students)
+                self.backend.insert_many(students)
+
+    def check_new(self, students):
+        from transaction import TransactionError
+        if self.preload:
+            rolls, emails = self.roll_index, self.email_index
+        else:
+            # Looking each one up would read the store once per student
+            rolls, emails = set(), set()
+            for s in self.backend.scan():
+                rolls.add(s.student_roll)
+                emails.add(s.email.lower())
+        errors = {}
+        new_rolls, new_emails = set(), set()
+        for s in students:
+            email = s.email.lower()
+            codes = []
+            if s.student_roll in rolls or s.student_roll in new_rolls:
+                codes.append("ROLL_EXISTS")
+            if email in emails or email in new_emails:
+                codes.append("EMAIL_EXISTS")
+            if codes:
+                errors[s.student_roll] = codes
+            new_rolls.add(s.student_roll)
+            new_emails.add(email)
+        if errors:
+            raise TransactionError(errors)
+
+    # with manager.transaction() as tx: tx.add(...), tx.update(roll, ...),
+    # tx.delete(roll). The changes are staged, checked together on leaving the
+    # block and committed in one write; an exception in the block (or a failed
+    # check) leaves the roster and the store untouched. The store stays locked
+    # for the whole block.
+    @contextmanager
+    def transaction(self):
+        from transaction import Transaction
+        with self.backend.lock():
+            self.refresh()
+            tx = Transaction(self)
+            yield tx
+            tx.commit()
+
+    # Term rollover: every student (or every student of dept) moves up one
+    # semester as a single transaction; those in the last one stay there
+    def promote_students(self, dept=None):
+        # Matched on dept_key: the stored depts may not have been read yet
+        dept = dept_key(dept) if dept else None
+        promoted = last = 0
+        with self.transaction() as tx:
+            for s in list(self.iter_students()):
+                if dept is not None and dept_key(s.dept) != dept:
+                    continue
+                if s.semester >= LAST_SEMESTER:
+                    last += 1
+                    continue
+                updated = s.copy()
+                updated.semester = s.semester + 1
+                tx.put(updated, s)
+                promoted += 1
+        return {"promoted": promoted, "in_last_semester": last}
+
+    # Validation and the write happen under one lock, so no other process
+    # can add a clashing roll or email in between
+    def bulk_import(self, path, reject_path=None):
+        import bulk
+        with self.backend.lock():
+            self.refresh()
+            return bulk.bulk_import(self, path, reject_path)
+
+    def export(self, path):
+        import bulk
+        return bulk.export(self, path)
+
+    # The changes made after sequence number seq, oldest first, as dicts (see
+    # changefeed.py); raises FeedTrimmedError if the feed no longer goes back that far
+    def changes_since(self, seq):
+        return self.feed.since(seq)
+
+    # Without a preloaded roster this streams from the backend, one record at a time
+    def iter_students(self):
+        return iter(self.students) if self.preload else iter(self.backend.scan())
+
+    # Students whose lower-cased name contains name; names starting with it come first
+    def find_by_name(self, name, limit=None):
+        if not self.preload:
+            matches = self.backend.search_name(name)[:limit]
+        else:
+            matches = [self.roll_index[roll] for roll in self.name_index.search(name, limit)]
+        if perf.enabled:
+            perf.lookup("name_index", matches)
+        return matches
+
+    # "Did you mean": students whose name is spelled or sounds like name, however
+    # it is cased or spaced, most similar first (see fuzzy.py). The index is
+    # built on first use and then kept up to date with the roster; without a
+    # preloaded roster one is built from a scan for each search.
+    def find_similar_names(self, name, limit=10):
+        from fuzzy import FuzzyIndex
+        if not self.preload:
+            students = {s.student_roll: s for s in self.backend.scan()}
+            index = FuzzyIndex()
+            for roll, s in students.items():
+                index.add(roll, s.name)
+        else:
+            students = self.roll_index
+            if self.fuzzy_index is None:
+                self.fuzzy_index = FuzzyIndex()
+                for s in self.students:
+                    self.fuzzy_index.add(s.student_roll, s.name)
+            index = self.fuzzy_index
+        matches = [students[roll] for roll, _ in index.search(name, limit)]
+        if perf.enabled:
+            perf.lookup("fuzzy_index", matches)
+        return matches
+
+    # Non-interactive API for scripts and the command line. Values are checked
+    # exactly like typed input, and invalid ones raise ValidationError.
+    def create_student(self, name, roll, cgpa, email, dept, semester, phone):
+        values = clean_input({
+            "name": name, "roll": roll, "cgpa": cgpa, "email": email,
+            "dept": dept, "semester": semester, "phone": phone
+        })
+        columns = {field: [value] for field, value in values.items()}
+        # Checked and written under one lock, so another process can't take the roll first
+        with self.backend.lock():
+            self.refresh()
+            errors = validate_columns(columns, self.roll_index, self.email_index)[0]
+            if errors:
+                raise ValidationError(errors)
+            student = Student.from_input(values)
+            self.insert_student(student, checked=True)
+        return student
+
+    def get_student(self, roll):
+        s = self.roll_index.get(int(roll))
+        if perf.enabled:
+            perf.lookup("roll_index", s is not None)
+        return s
+
+    def find_students(self, roll=None, name=None, email=None, limit=None):
+        if roll is not None:
+            s = self.get_student(roll)
+            return [s] if s else []
+        if email is not None:
+            s = self.email_index.get(email.strip().lower())
+            if perf.enabled:
+                perf.lookup("email_index", s is not None)
+            return [s] if s else []
+        return self.find_by_name(name.strip().lower(), limit)
+
+    # Changes are given as field=value; fields left out (or None) keep their value.
+    # Returns the updated student, or None if the roll doesn't exist.
+    def modify_student(self, roll, **changes):
+        changes = {field: value for field, value in changes.items() if value is not None}
+        unknown = set(changes) - {"name", "cgpa", "email", "dept", "semester", "phone"}
+        if unknown:
+            raise TypeError(f"Cannot update: {', '.join(sorted(unknown))}")
+        # Read, checked and written under one lock: nobody can change the student in between
+        with self.backend.lock():
+            self.refresh()
+            s = self.get_student(roll)
+            if s is None or not changes:
+                return s  # nothing to change: no write, no change feed entry
+            values = clean_input({**s.to_dict(), **changes})
+            columns = {field: [values[field]] for field in changes}
+            # The student's own email isn't a duplicate of itself
+            emails = self.email_index if values["email"] != s.email.lower() else ()
+            errors = validate_columns(columns, existing_emails=emails)[0]
+            if errors:
+                raise ValidationError(errors)
+            updated = Student.from_input(values)
+            if updated.to_dict() == s.to_dict():
+                return s  # every value given is the current one: nothing to write either
+            self.apply_update(s, updated)
+        return s
+
+    def remove_student(self, roll):
+        with self.backend.lock():
+            self.refresh()
+            s = self.get_student(roll)
+            if s is not None:
+                self.drop_student(s)
+        return s
+
+    # Students in roll order, optionally only rolls roll_from..roll_to (inclusive),
+    # skipping offset of them and returning at most limit
+    def list_students(self, offset=0, limit=None, roll_from=None, roll_to=None):
+        if not self.preload:
+            return self.backend.list_range(roll_from, roll_to, offset, limit)
+        return [self.roll_index[roll] for roll in self.roll_order.range(roll_from, roll_to, offset, limit)]
+
+    def count_students(self, roll_from=None, roll_to=None):
+        if not self.preload:
+            return self.backend.count_range(roll_from, roll_to)
+        return self.roll_order.count(roll_from, roll_to)
+
+    # CGPA count, mean, median, percentiles and histogram, overall (by=None) or
+    # grouped by "dept", "semester" or "dept,semester"
+    def cgpa_stats(self, by=None):
+        if not self.preload:
+            from stats import compute_stats
+            return compute_stats(self.iter_students(), by)
+        return self.stats.report(by)
+
+    # Rank queries, and roll -> Student for the rolls they return. Without a
+    # preloaded roster both are built from one scan per call, so the students
+    # ranked aren't then looked up in the store one at a time.
+    def rank_index(self):
+        if self.preload:
+            return self.ranks, self.roll_index
+        from ranking import RankIndex
+        students = {s.student_roll: s for s in self.iter_students()}
+        return RankIndex.from_students(students.values()), students
+
+    # The k highest CGPAs, optionally only in one dept and/or semester ("5" or "5th")
+    def top_students(self, k, dept=None, semester=None):
+        errors = ["COUNT_NEGATIVE"] if k < 0 else []
+        if semester is not None:
+            # Checked like typed input: "5" or "5th", within 1..8
+            semester = clean_input({"semester": semester})["semester"]
+            errors += validate_columns({"semester": [semester]})[0]
+        if errors:
+            raise ValidationError(errors)
+        # Built first: reading the roster registers how its depts are spelled
+        ranks, students = self.rank_index()
+        if dept is not None:
+            dept = find_dept(dept)
+        if semester is not None:
+            semester = semester_number(semester)
+        grouping, key = {
+            (False, False): (None, "All"),
+            (True, False): ("dept", dept),
+            (False, True): ("semester", semester),
+            (True, True): ("dept,semester", (dept, semester)),
+        }[(dept is not None, semester is not None)]
+        return [students[roll] for roll in ranks.top(k, grouping, key)]
+
+    # Rank, group size and percentile of a student by CGPA, among everyone
+    # (within=None) or within their own "dept", "semester" or "dept,semester"
+    def rank_of(self, roll, within=None):
+        s = self.get_student(roll)
+        if s is None:
+            return None
+        return self.rank_index()[0].rank_of(s, within)
+
+    # Multi-field queries such as 'dept == "CSE" and cgpa >= 3.5 and name contains "hasan"'
+    # (see query.py); invalid queries raise QueryError
+    def query(self, text, limit=None):
+        from query import parse_query, run_query
+        return run_query(self, parse_query(text), limit)[0]
+
+    # The plan chosen for a query and how many rows it examined and matched
+    def explain(self, text):
+        from query import parse_query, run_query
+        return run_query(self, parse_query(text))[1]
 
     def add_student(self):
 
@@ -41,7 +572,7 @@ class StudentManager:
         # Roll
         while True:
             sroll = input("Enter Student Roll: ").strip()
-            if validate_roll(sroll, self.students):
+            if validate_roll(sroll, self.roll_index):
                 sroll = int(sroll)
                 break
             else:
@@ -59,7 +590,7 @@ class StudentManager:
         while True:
             email = input("Enter Email: ").strip().lower()
             if email and validate_email(email):
-                if any(s.email.lower() == email for s in self.students):
+                if email in self.email_index:
                     print("Error: Email already exists!")
                 else:
                     break
@@ -96,27 +627,45 @@ class StudentManager:
         try:
             # Add student
             new_student = Student(name, sroll, cgpa, email, dept, semester, phone)
-            self.students.append(new_student)
-            self.save_data()
+            self.insert_student(new_student)
             print("Student added successfully.")
         except Exception as e:
             print(f"Error adding student: {e}")
 
-    def view_all(self):
+    def view_all(self, page_size=PAGE_SIZE):
         width = 162
         print(f"\n{'--- Student Records ---':^{width}}")
-        if not self.students:
+        roll_from = roll_to = None
+        bounds = input("Roll range, e.g. 200100-200199 [Press Enter for all]: ").strip()
+        if bounds:
+            low, _, high = bounds.partition("-")
+            if not (low.strip().isdigit() and high.strip().isdigit()):
+                print("Error: Range must look like 200100-200199!")
+                return
+            roll_from, roll_to = int(low), int(high)
+
+        total = self.count_students(roll_from, roll_to)
+        if not total:
             print("No records found.")
             return
 
-        print("-" * width)
-        print(f"{'':<3}{'Name':<25} {'Roll':<10} {'CGPA':<6} {'Email':<40} {'Dept':<40} {'Semester':<10} {'Phone':<15}")
-        print("-" * width)
-
-        for s in sorted(self.students, key=lambda x: x.student_roll):
-            print(f"{'':<3}{s.name:<25} {s.student_roll:<10} {float(s.cgpa):<6.2f} {s.email:<40} {s.dept:<40} {s.semester:<10} {s.phone:<15}")
-
-        print("-" * width)
+        # Each page is fetched from the roll index and written in one go
+        rule = "-" * width
+        header = f"{'':<3}{'Name':<25} {'Roll':<10} {'CGPA':<6} {'Email':<40} {'Dept':<40} {'Semester':<10} {'Phone':<15}"
+        for offset in range(0, total, page_size):
+            page = self.list_students(offset, page_size, roll_from, roll_to)
+            lines = [rule, header, rule]
+            lines.extend(
+                f"{'':<3}{s.name:<25} {s.student_roll:<10} {float(s.cgpa):<6.2f} {s.email:<40} {s.dept:<40} {semester_label(s.semester):<10} {s.phone:<15}"
+                for s in page
+            )
+            lines.append(rule)
+            sys.stdout.write("\n".join(lines) + "\n")
+            shown = offset + len(page)
+            if shown < total:
+                more = input(f"Showing {shown} of {total}. Press Enter for more, or q to stop: ").strip().lower()
+                if more == "q":
+                    break
 
     def search_student(self):
         print("\nSearch Student By:")
@@ -129,28 +678,33 @@ class StudentManager:
         if choice == "1":  # Roll
             sroll = input("Enter Roll: ").strip()
             if sroll.isdigit():
-                sroll = int(sroll)
-                for s in self.students:
-                    if s.student_roll == sroll:
-                        print(f"Found: {s.name} | {s.dept} | {s.email} | {s.cgpa} | {s.semester} | {s.phone}")
-                        return
+                s = self.roll_index.get(int(sroll))
+                if s:
+                    print(f"Found: {s.name} | {s.dept} | {s.email} | {s.cgpa} | {semester_label(s.semester)} | {s.phone}")
+                    return
             print("Student not found.")
 
         elif choice == "2":  # Name
             name = input("Enter Name: ").strip().lower()
-            results = [s for s in self.students if name in s.name.lower()]
+            results = self.find_by_name(name)
             if results:
                 for s in results:
-                    print(f"Found: {s.name} | {s.student_roll} | {s.dept} | {s.email} | {s.cgpa} | {s.semester} | {s.phone}")
-            else:
+                    print(f"Found: {s.name} | {s.student_roll} | {s.dept} | {s.email} | {s.cgpa} | {semester_label(s.semester)} | {s.phone}")
+                return
+            suggestions = self.find_similar_names(name) if name else []
+            if not suggestions:
                 print("Student not found.")
+                return
+            print("Student not found. Did you mean:")
+            for s in suggestions:
+                print(f"  {s.name} | {s.student_roll} | {s.dept} | {s.email} | {s.cgpa} | {semester_label(s.semester)} | {s.phone}")
 
         elif choice == "3":  # Email
             email = input("Enter Email: ").strip().lower()
-            for s in self.students:
-                if s.email.lower() == email:
-                    print(f"Found: {s.name} | {s.student_roll} | {s.dept} | {s.cgpa} | {s.semester} | {s.phone}")
-                    return
+            s = self.email_index.get(email)
+            if s:
+                print(f"Found: {s.name} | {s.student_roll} | {s.dept} | {s.cgpa} | {semester_label(s.semester)} | {s.phone}")
+                return
             print("Student not found.")
         else:
             print("Invalid choice.")
@@ -160,90 +714,102 @@ class StudentManager:
         if not sroll.isdigit():
             print("Error: Roll must be numeric!")
             return
-        sroll = int(sroll)
-        for i, s in enumerate(self.students):
-            if s.student_roll == sroll:
-                confirm = input(f"Are you sure you want to delete {s.name}? (y/n): ").strip().lower()
-                if confirm in ["y", "yes"]:
-                    self.students.pop(i)
-                    self.save_data()
-                    print("Student deleted successfully.")
-                else:
-                    print("Deletion cancelled.")
+        s = self.roll_index.get(int(sroll))
+        if not s:
+            print("Student not found.")
+            return
+        expected = s.to_dict()
+        confirm = input(f"Are you sure you want to delete {s.name}? (y/n): ").strip().lower()
+        if confirm in ["y", "yes"]:
+            try:
+                self.drop_student(s, expected)
+            except ConflictError as e:
+                print(f"Error: {e}")
                 return
-        print("Student not found.")
+            print("Student deleted successfully.")
+        else:
+            print("Deletion cancelled.")
     
     def update_student(self):
         sroll = input("\nEnter Roll to update: ").strip()
         if not sroll.isdigit():
             print("Error: Roll must be numeric!")
             return
-        sroll = int(sroll)
 
         # Find student
-        for s in self.students:
-            if s.student_roll == sroll:
-                print(f"Updating student: {s.name} | {s.dept} | {s.email} | {s.cgpa} | {s.semester} | {s.phone}")
-
-                # Name
-                while True:
-                    new_name = input(f"Enter Name [{s.name}][Press Enter to keep current]: ").strip()
-                    if not new_name:
-                        new_name = s.name
-                    if validate_name(new_name):
-                        s.name = new_name
-                        break
-
-                # Dept
-                while True:
-                    new_dept = input(f"Enter Dept [{s.dept}][Press Enter to keep current]: ").strip()
-                    if not new_dept:
-                        new_dept = s.dept
-                    if validate_dept(new_dept):
-                        s.dept = new_dept
-                        break
-
-                # Email
-                while True:
-                    new_email = input(f"Enter Email [{s.email}][Press Enter to keep current]: ").strip().lower()
-                    if not new_email:
-                        new_email = s.email
-                    if validate_email(new_email) or new_email == s.email:
-                        s.email = new_email
-                        break
-
-                # CGPA
-                while True:
-                    new_cgpa = input(f"Enter CGPA [{s.cgpa}][Press Enter to keep current]: ").strip()
-                    if not new_cgpa:
-                        break
-                    if validate_cgpa(new_cgpa):
-                        s.cgpa = float(new_cgpa)
-                        break
-
-                # Phone
-                while True:
-                    new_phone = input(f"Enter Phone [{s.phone}][Press Enter to keep current]: ").strip()
-                    if not new_phone:
-                        break
-                    if validate_phone(new_phone):
-                        s.phone = new_phone
-                        break
-
-                # Semester
-                while True:
-                    new_semester = input(f"Enter Semester [({s.semester}), Ex. 1,2,3][Press Enter to keep current]: ").strip()
-                    if not new_semester:
-                        break
-                    sem_val = validate_semester(new_semester)
-                    if sem_val:
-                        s.semester = sem_val
-                        break
-
-                self.save_data()
-                print("Student updated successfully.")
-                return
+        s = self.roll_index.get(int(sroll))
+        if not s:
+            print("Student not found.")
+            return
+        print(f"Updating student: {s.name} | {s.dept} | {s.email} | {s.cgpa} | {semester_label(s.semester)} | {s.phone}")
 
-        print("Student not found.")
+        # Kept to detect someone else changing the student while it is being edited
+        expected = s.to_dict()
+        updated = s.copy()
 
-        
+        # Name
+        while True:
+            new_name = input(f"Enter Name [{s.name}][Press Enter to keep current]: ").strip()
+            if not new_name:
+                new_name = s.name
+            if validate_name(new_name):
+                updated.name = new_name
+                break
+
+        # Dept
+        while True:
+            new_dept = input(f"Enter Dept [{s.dept}][Press Enter to keep current]: ").strip()
+            if not new_dept:
+                new_dept = s.dept
+            if validate_dept(new_dept):
+                updated.dept = dept_name(new_dept)
+                break
+
+        # Email
+        while True:
+            new_email = input(f"Enter Email [{s.email}][Press Enter to keep current]: ").strip().lower()
+            if not new_email:
+                new_email = s.email
+            if new_email.lower() == s.email.lower():
+                break
+            if validate_email(new_email):
+                if new_email in self.email_index:
+                    print("Error: Email already exists!")
+                    continue
+                updated.email = new_email
+                break
+
+        # CGPA
+        while True:
+            new_cgpa = input(f"Enter CGPA [{s.cgpa}][Press Enter to keep current]: ").strip()
+            if not new_cgpa:
+                break
+            if validate_cgpa(new_cgpa):
+                updated.cgpa = float(new_cgpa)
+                break
+
+        # Phone
+        while True:
+            new_phone = input(f"Enter Phone [{s.phone}][Press Enter to keep current]: ").strip()
+            if not new_phone:
+                break
+            if validate_phone(new_phone):
+                updated.phone = new_phone
+                break
+
+        # Semester
+        while True:
+            new_semester = input(f"Enter Semester [({semester_label(s.semester)}), Ex. 1,2,3][Press Enter to keep current]: ").strip()
+            if not new_semester:
+                break
+            sem_val = validate_semester(new_semester)
+            if sem_val:
+                updated.semester = sem_val
+                break
+
+        try:
+            self.apply_update(s, updated, expected)
+        except (ConflictError, ValidationError) as e:
+            print(f"Error: {e}")
+            return
+        print("Student updated successfully.")
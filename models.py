@@ -1,11 +1,99 @@
+import sys
+
+SEMESTER_SUFFIX = {1: "st", 2: "nd", 3: "rd"}
+
+# Canonical dept names by lower-cased alias. Any spelling listed here is stored
+# as the name it maps to; other depts are matched ignoring case and spacing
+# against the first spelling stored.
+DEPT_ALIASES = {
+    "computer science and engineering": "CSE",
+    "computer science & engineering": "CSE",
+    "computer science": "CSE",
+    "electrical and electronic engineering": "EEE",
+    "electrical & electronic engineering": "EEE",
+    "electrical and electronics engineering": "EEE",
+    "electronics and communication engineering": "ECE",
+    "mechanical engineering": "ME",
+    "civil engineering": "CE",
+    "industrial and production engineering": "IPE",
+    "business administration": "BBA",
+    "bachelor of business administration": "BBA",
+}
+
+
+def semester_label(number):
+    return f"{number}{SEMESTER_SUFFIX.get(number, 'th')}"
+
+
+def semester_number(label):
+    # "5th" -> 5; semesters are kept as numbers and only labelled for display
+    if type(label) is int:
+        return label
+    return int(str(label).rstrip("stndrh"))
+
+
+# Every dept is stored as one shared, interned string per department, so
+# records don't each carry a copy and equal depts compare by identity
+class DeptDictionary:
+    def __init__(self, aliases=DEPT_ALIASES):
+        self.names = {}  # spelling (as given, and normalised) -> canonical name
+        for alias, name in aliases.items():
+            self.add_alias(alias, name)
+
+    def add_alias(self, alias, name):
+        name = self.canonical(name)
+        self.names[self.key(alias)] = name
+
+    @staticmethod
+    def key(dept):
+        return " ".join(dept.split()).lower()
+
+    def canonical(self, dept):
+        name = self.names.get(dept)
+        if name is None:
+            key = self.key(dept)
+            name = self.names.get(key)
+            if name is None:
+                name = self.names[key] = sys.intern(" ".join(dept.split()))
+            self.names[dept] = name
+        return name
+
+    # The canonical name of a dept already known (from the aliases or a stored
+    # record) without registering a new one, so filters and other input that is
+    # only compared against records can't change how stored depts are spelled;
+    # an unknown dept comes back with its spacing tidied
+    def lookup(self, dept):
+        name = self.names.get(dept) or self.names.get(self.key(dept))
+        return name if name is not None else " ".join(dept.split())
+
+
+DEPARTMENTS = DeptDictionary()
+
+
+def dept_name(dept):
+    return DEPARTMENTS.canonical(dept)
+
+
+# For depts given to look records up by, never stored
+def find_dept(dept):
+    return DEPARTMENTS.lookup(dept)
+
+
+# What two spellings of the same dept have in common, aliases included
+def dept_key(dept):
+    return DEPARTMENTS.key(DEPARTMENTS.lookup(dept))
+
+
 class Student:
+    __slots__ = ("name", "student_roll", "cgpa", "email", "dept", "semester", "phone")
+
     def __init__(self, name, student_roll, cgpa, email, dept, semester, phone):
         self.name = name
         self.student_roll = student_roll
         self.cgpa = cgpa  
         self.email = email
-        self.dept = dept
-        self.semester = semester
+        self.dept = dept_name(dept)
+        self.semester = semester_number(semester)
         self.phone = phone
 
     def to_dict(self):
@@ -18,3 +106,15 @@ class Student:
             "semester": self.semester,
             "phone": self.phone
         }
+
+    def copy(self):
+        return Student(self.name, self.student_roll, self.cgpa, self.email, self.dept, self.semester, self.phone)
+
+    @classmethod
+    def from_dict(cls, s):
+        return cls(s['name'], s['roll'], s['cgpa'], s['email'], s['dept'], s['semester'], s['phone'])
+
+    # From values that passed validation, still as text
+    @classmethod
+    def from_input(cls, v):
+        return cls(v['name'], int(v['roll']), float(v['cgpa']), v['email'], v['dept'], int(v['semester']), v['phone'])
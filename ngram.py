@@ -0,0 +1,90 @@
+import heapq
+from array import array
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# Where the query appears in a matching text: the start, the start of a later word, or elsewhere
+def match_rank(text, query):
+    if text.startswith(query):
+        return 0
+    if " " + query in text:
+        return 1
+    return 2
+
+
+# Inverted trigram index for substring search over short lower-cased texts
+# (names) keyed by roll. Postings are append-only arrays of rolls: removing
+# a key only drops its text, candidates are always verified against the
+# current text, and rebuild() purges the stale postings once they pile up.
+class TrigramIndex:
+    def __init__(self):
+        self.texts = {}
+        self.postings = {}
+        self.entries = 0
+        self.stale = 0
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, key, text):
+        if key in self.texts:
+            self.remove(key)
+        self.texts[key] = text
+        for gram in trigrams(text):
+            posting = self.postings.get(gram)
+            if posting is None:
+                posting = self.postings[gram] = array("i")
+            posting.append(key)
+            self.entries += 1
+
+    def remove(self, key):
+        text = self.texts.pop(key, None)
+        if text is None:
+            return
+        self.stale += len(trigrams(text))
+        if self.stale > 1024 and self.stale * 2 > self.entries:
+            self.rebuild()
+
+    def rebuild(self):
+        texts = self.texts
+        self.texts, self.postings, self.entries, self.stale = {}, {}, 0, 0
+        for key, text in texts.items():
+            self.add(key, text)
+
+    def candidates(self, query):
+        grams = trigrams(query)
+        if not grams:
+            # Shorter than a trigram: every text has to be checked
+            return self.texts.keys()
+        # Any text containing the query contains all of its trigrams, so the
+        # rarest trigram's posting already holds every match
+        best = None
+        for gram in grams:
+            posting = self.postings.get(gram)
+            if posting is None:
+                return ()
+            if best is None or len(posting) < len(best):
+                best = posting
+        return set(best)
+
+    # Keys whose text contains query: matches at the start of the text first,
+    # then at the start of a word, then anywhere; key order within each group
+    def search(self, query, limit=None):
+        texts = self.texts
+        hits = [key for key in self.candidates(query) if key in texts and query in texts[key]]
+        groups = ([], [], [])
+        for key in hits:
+            groups[match_rank(texts[key], query)].append(key)
+        results = []
+        for group in groups:
+            if limit is not None:
+                group = heapq.nsmallest(limit - len(results), group)
+                results.extend(group)
+                if len(results) >= limit:
+                    break
+            else:
+                results.extend(sorted(group))
+        return results
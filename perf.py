@@ -0,0 +1,182 @@
+import functools
+import json
+import os
+import time
+
+# Opt-in instrumentation: call timers and counters for StudentManager and the
+# storage backends. Nothing is measured until enable() is called:
+# - timers are wrappers that enable() installs on the methods in CALLS and
+#   disable() takes off again, so while off the methods are the plain ones;
+# - counters (records scanned, bytes written, fsyncs, index hits/misses, ...)
+#   are bumped at the places they happen behind an `if perf.enabled:` check.
+# A report is a dict of both; sinks (LogSink, PrometheusSink, or anything with
+# an emit(report) method) receive it from emit().
+
+enabled = False
+counters = {}  # name -> count
+timers = {}  # "Class.method" -> [calls, total seconds, longest call in seconds]
+sinks = []
+
+# Methods timed per class; interactive menu actions are left out as they mostly wait for input
+CALLS = {
+    "StudentManager": (
+        "load_data", "build_indexes", "refresh", "save_data", "compact", "close", "add_students", "bulk_import", "export",
+        "create_student", "modify_student", "remove_student", "insert_student", "apply_update", "drop_student",
+        "commit_changes", "promote_students", "changes_since",
+        "get_student", "find_students", "find_by_name", "find_similar_names", "list_students", "count_students", "cgpa_stats",
+        "top_students", "rank_of", "query", "explain",
+    ),
+    "StorageBackend": (
+        "load", "get", "get_by_email", "search_name", "list_range", "insert", "insert_many", "update",
+        "delete", "apply_changes", "save_all", "changes", "compact", "sync", "close",
+    ),
+}
+# Modules whose validate_columns (the row validation loop) is timed
+VALIDATING_MODULES = ("manager", "bulk")
+
+patched = []  # (owner, attribute, what owner.__dict__ held before, or None)
+
+
+def count(name, n=1):
+    counters[name] = counters.get(name, 0) + n
+
+
+# Add counters gathered elsewhere (e.g. by a worker process)
+def merge(counts):
+    for name, n in counts.items():
+        count(name, n)
+
+
+# A lookup in one of the indexes that found something (hit) or nothing (miss)
+def lookup(index, found):
+    count(f"{index}_hits" if found else f"{index}_misses")
+
+
+def timed(name, func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            timer = timers.get(name)
+            if timer is None:
+                timer = timers[name] = [0, 0.0, 0.0]
+            timer[0] += 1
+            timer[1] += elapsed
+            if elapsed > timer[2]:
+                timer[2] = elapsed
+    return wrapper
+
+
+def patch(owner, attribute, name):
+    patched.append((owner, attribute, vars(owner).get(attribute)))
+    setattr(owner, attribute, timed(name, getattr(owner, attribute)))
+
+
+def enable(*new_sinks):
+    global enabled
+    sinks.extend(new_sinks)
+    if enabled:
+        return
+    import importlib
+    from backends import BinaryBackend, JsonBackend, ShardedBackend, SqliteBackend
+    from manager import StudentManager
+    classes = (StudentManager, JsonBackend, BinaryBackend, SqliteBackend, ShardedBackend)
+    for cls in classes:
+        calls = CALLS["StudentManager" if cls is StudentManager else "StorageBackend"]
+        # A subclass of a class above only needs its own methods timed; it inherits the rest already wrapped
+        subclass = any(parent in classes for parent in cls.__mro__[1:])
+        for attribute in calls:
+            if attribute in vars(cls) or not subclass and hasattr(cls, attribute):
+                patch(cls, attribute, f"{cls.__name__}.{attribute}")
+    for module in VALIDATING_MODULES:
+        patch(importlib.import_module(module), "validate_columns", "validate_columns")
+    enabled = True
+
+
+def disable():
+    global enabled
+    while patched:
+        owner, attribute, original = patched.pop()
+        if original is None:
+            delattr(owner, attribute)  # it was inherited
+        else:
+            setattr(owner, attribute, original)
+    sinks.clear()
+    enabled = False
+
+
+def reset():
+    counters.clear()
+    timers.clear()
+
+
+def report():
+    return {
+        "timers": {
+            name: {"calls": calls, "total_s": round(total, 6), "mean_ms": round(total / calls * 1000, 4), "max_ms": round(longest * 1000, 4)}
+            for name, (calls, total, longest) in sorted(timers.items(), key=lambda item: -item[1][1])
+        },
+        "counters": dict(sorted(counters.items())),
+    }
+
+
+def emit():
+    current = report()
+    for sink in sinks:
+        sink.emit(current)
+
+
+def format_report(current):
+    lines = [f"{'Call':<36} {'Calls':>8} {'Total ms':>10} {'Mean ms':>10} {'Max ms':>10}"]
+    for name, t in current["timers"].items():
+        lines.append(f"{name:<36} {t['calls']:>8} {t['total_s'] * 1000:>10.2f} {t['mean_ms']:>10.3f} {t['max_ms']:>10.3f}")
+    if current["counters"]:
+        lines.append("")
+        lines.append(f"{'Counter':<36} {'Value':>8}")
+        lines.extend(f"{name:<36} {value:>8}" for name, value in current["counters"].items())
+    return "\n".join(lines)
+
+
+def prometheus_text(current, prefix="student_records"):
+    lines = []
+    families = (
+        ("calls_total", "counter", "Calls per method.", "calls"),
+        ("call_seconds_total", "counter", "Seconds spent in each method, nested calls included.", "total_s"),
+        ("call_max_seconds", "gauge", "Longest single call of each method.", "max_ms"),
+    )
+    for suffix, kind, help, field in families:
+        lines.append(f"# HELP {prefix}_{suffix} {help}")
+        lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+        for name, t in current["timers"].items():
+            value = t[field] / 1000 if field == "max_ms" else t[field]
+            lines.append(f'{prefix}_{suffix}{{call="{name}"}} {value:.9g}')
+    for name, value in current["counters"].items():
+        lines.append(f"# TYPE {prefix}_{name}_total counter")
+        lines.append(f"{prefix}_{name}_total {value}")
+    return "\n".join(lines) + "\n"
+
+
+# Appends every report to a file as one JSON line
+class LogSink:
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, current):
+        with open(self.path, "a") as file:
+            file.write(json.dumps({"time": time.strftime("%Y-%m-%dT%H:%M:%S"), **current}) + "\n")
+
+
+# Keeps a file in the Prometheus text format up to date (e.g. for node_exporter's
+# textfile collector); it is replaced in one step so a scrape never sees half of it
+class PrometheusSink:
+    def __init__(self, path):
+        self.path = path
+
+    def emit(self, current):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as file:
+            file.write(prometheus_text(current))
+        os.replace(tmp, self.path)
@@ -0,0 +1,269 @@
+import operator
+import re
+from bisect import bisect_left, bisect_right
+import perf
+from models import dept_key, find_dept, semester_number
+
+# A query is a conjunction of predicates over student fields, e.g.
+#   dept == "CSE" and semester in {"3rd", "4th"} and cgpa >= 3.5 and name contains "hasan"
+# The planner estimates how many rows each usable index would produce, reads
+# candidates from the most selective one and checks the remaining predicates
+# on just those rows.
+
+FIELDS = {"name", "roll", "cgpa", "email", "dept", "semester", "phone"}
+COMPARISONS = {
+    "==": operator.eq, "!=": operator.ne,
+    "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge,
+}
+TOKEN = re.compile(r'''\s*(?:(?P<string>"[^"]*"|'[^']*')|(?P<number>-?\d+(?:\.\d+)?)|(?P<op>==|!=|<=|>=|<|>|[{},])|(?P<word>[A-Za-z_]+))''')
+
+
+class QueryError(ValueError):
+    pass
+
+
+class Predicate:
+    __slots__ = ("field", "op", "value")
+
+    def __init__(self, field, op, value):
+        if field not in FIELDS:
+            raise QueryError(f"Unknown field: {field}")
+        if op not in COMPARISONS and op not in ("in", "contains"):
+            raise QueryError(f"Unknown operator: {op}")
+        if op == "contains" and field in ("roll", "cgpa"):
+            raise QueryError(f"'contains' needs a text field, not {field}")
+        self.field = field
+        self.op = op
+        self.value = {normalise(field, v) for v in value} if op == "in" else normalise(field, value, op)
+
+    def __repr__(self):
+        value = "{" + ", ".join(sorted(map(repr, self.value))) + "}" if self.op == "in" else repr(self.value)
+        return f"{self.field} {self.op} {value}"
+
+    def test(self, student):
+        actual = field_value(student, self.field)
+        if self.op == "in":
+            return actual in self.value
+        if self.op == "contains":
+            return self.value in actual
+        return COMPARISONS[self.op](actual, self.value)
+
+
+def normalise(field, value, op="=="):
+    try:
+        if field == "roll":
+            return int(value)
+        if field == "cgpa":
+            return float(value)
+        if field == "semester":
+            return semester_number(value)
+    except ValueError:
+        raise QueryError(f"Bad value for {field}: {value!r}") from None
+    value = str(value)
+    # Depts are compared by dept_key, so case, spacing and aliases don't matter
+    # and query values never become the stored spelling of a dept
+    if field == "dept":
+        return " ".join(value.split()).lower() if op == "contains" else dept_key(value)
+    # Names and emails are matched case-insensitively, as in search
+    return value.lower() if field in ("name", "email") else value
+
+
+def field_value(student, field):
+    if field == "roll":
+        return student.student_roll
+    if field == "cgpa":
+        return float(student.cgpa)
+    value = getattr(student, field)
+    if field == "dept":
+        return dept_key(value)
+    return value.lower() if field in ("name", "email") else value
+
+
+def parse_query(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = TOKEN.match(text, pos)
+        if not match or match.end() == pos:
+            raise QueryError(f"Can't read the query at: {text[pos:]!r}")
+        pos = match.end()
+        kind = match.lastgroup
+        token = match.group(kind)
+        tokens.append((kind, token[1:-1] if kind == "string" else token))
+
+    predicates = []
+    i = 0
+
+    def take(expected=None):
+        nonlocal i
+        if i >= len(tokens):
+            raise QueryError("Query ends too early")
+        kind, token = tokens[i]
+        if expected and token.lower() != expected:
+            raise QueryError(f"Expected {expected!r}, found {token!r}")
+        i += 1
+        return kind, token
+
+    while True:
+        _, field = take()
+        _, op = take()
+        op = op.lower()
+        if op == "in":
+            take("{")
+            values = []
+            while True:
+                values.append(take()[1])
+                _, sep = take()
+                if sep == "}":
+                    break
+                if sep != ",":
+                    raise QueryError(f"Expected ',' or '}}', found {sep!r}")
+            predicates.append(Predicate(field.lower(), "in", values))
+        else:
+            predicates.append(Predicate(field.lower(), op, take()[1]))
+        if i == len(tokens):
+            return predicates
+        take("and")
+
+
+class Plan:
+    def __init__(self, access, estimate, fetch, covered=()):
+        self.access = access        # description of how candidates are read
+        self.estimate = estimate    # rows the access path will produce
+        self.fetch = fetch          # () -> rolls, or Students when not preloaded
+        self.covered = covered      # predicates the access path answers exactly
+
+
+def roll_bounds(predicates):
+    low = high = None
+    for p in predicates:
+        value = p.value
+        if p.op in (">", ">="):
+            value = value + 1 if p.op == ">" else value
+            low = value if low is None else max(low, value)
+        if p.op in ("<", "<="):
+            value = value - 1 if p.op == "<" else value
+            high = value if high is None else min(high, value)
+    return low, high
+
+
+def cgpa_slice(entries, predicates):
+    # entries are (-cgpa, roll) sorted ascending, i.e. CGPA from highest to lowest
+    start, end = 0, len(entries)
+    for p in predicates:
+        if p.op in (">=", "==", ">"):
+            cut = bisect_right(entries, (-p.value, float("inf"))) if p.op != ">" else bisect_left(entries, (-p.value,))
+            end = min(end, cut)
+        if p.op in ("<=", "==", "<"):
+            cut = bisect_left(entries, (-p.value,)) if p.op != "<" else bisect_right(entries, (-p.value, float("inf")))
+            start = max(start, cut)
+    return start, max(start, end)
+
+
+def values_of(predicate):
+    return sorted(predicate.value) if predicate.op == "in" else [predicate.value]
+
+
+def candidate_plans(manager, predicates):
+    plans = []
+    by_field = {}
+    for p in predicates:
+        by_field.setdefault(p.field, []).append(p)
+
+    for p in by_field.get("roll", []):
+        if p.op == "==":
+            plans.append(Plan("roll hash index", 1, lambda v=p.value: [v] if v in manager.roll_index else [], (p,)))
+    ranged = [p for p in by_field.get("roll", []) if p.op in ("<", "<=", ">", ">=")]
+    if ranged:
+        low, high = roll_bounds(ranged)
+        count = manager.roll_order.count(low, high) if low is None or high is None or low <= high else 0
+        plans.append(Plan("roll sorted index range", count, lambda: manager.roll_order.range(low, high) if count else [], tuple(ranged)))
+
+    for p in by_field.get("email", []):
+        if p.op == "==":
+            plans.append(Plan("email hash index", 1, lambda v=p.value: [manager.email_index[v].student_roll] if v in manager.email_index else [], (p,)))
+
+    # Dept and semester use the rank index's per-group roll lists
+    ranks = manager.ranks
+    dept = next((p for p in by_field.get("dept", []) if p.op in ("==", "in")), None)
+    semester = next((p for p in by_field.get("semester", []) if p.op in ("==", "in")), None)
+
+    def group_plan(access, grouping, keys, covered):
+        lists = [ranks.group(grouping, key) for key in keys]
+        return Plan(access, sum(map(len, lists)), lambda: [roll for entries in lists for _, roll in entries], covered)
+
+    # Groups are keyed by the stored spelling, which the loaded roster registered
+    depts = [find_dept(d) for d in values_of(dept)] if dept else []
+    if dept:
+        plans.append(group_plan("dept group index", "dept", depts, (dept,)))
+    if semester:
+        plans.append(group_plan("semester group index", "semester", values_of(semester), (semester,)))
+    if dept and semester:
+        keys = [(d, s) for d in depts for s in values_of(semester)]
+        plans.append(group_plan("dept+semester group index", "dept,semester", keys, (dept, semester)))
+
+    ranged = [p for p in by_field.get("cgpa", []) if p.op in ("<", "<=", ">", ">=", "==")]
+    if ranged:
+        entries = ranks.group()
+        start, end = cgpa_slice(entries, ranged)
+        plans.append(Plan("cgpa rank index range", end - start, lambda: [roll for _, roll in entries[start:end]], tuple(ranged)))
+
+    for p in by_field.get("name", []):
+        if p.op == "contains":
+            # Postings keep the rolls of deleted students until the index is rebuilt
+            texts = manager.name_index.texts
+            candidates = [roll for roll in manager.name_index.candidates(p.value) if roll in texts]
+            # Trigram candidates still have to be checked, so the predicate stays residual
+            plans.append(Plan("name trigram index", len(candidates), lambda c=candidates: c))
+    return plans
+
+
+def lazy_plan(manager, predicates):
+    # Without a preloaded roster only the backend's roll and email lookups help
+    for p in predicates:
+        if p.field == "roll" and p.op == "==":
+            return Plan("roll lookup in storage", 1, lambda: filter(None, [manager.get_student(p.value)]), (p,))
+        if p.field == "email" and p.op == "==":
+            return Plan("email lookup in storage", 1, lambda: filter(None, [manager.email_index.get(p.value)]), (p,))
+    return Plan("full scan (roster not preloaded)", None, manager.iter_students)
+
+
+def plan_query(manager, predicates):
+    if not manager.preload:
+        return lazy_plan(manager, predicates), []
+    scan = Plan("full scan", len(manager.roll_index), lambda: manager.roll_index.keys())
+    plans = candidate_plans(manager, predicates)
+    best = min(plans, key=lambda plan: plan.estimate, default=scan)
+    if best.estimate >= scan.estimate:
+        best = scan
+    return best, plans
+
+
+# Returns the matching students in roll order and an explain record
+def run_query(manager, predicates, limit=None):
+    plan, alternatives = plan_query(manager, predicates)
+    residual = [p for p in predicates if all(p is not c for c in plan.covered)]
+    students = plan.fetch()
+    if manager.preload:
+        students = map(manager.roll_index.__getitem__, students)
+    examined = 0
+    matches = []
+    for student in students:
+        examined += 1
+        if all(p.test(student) for p in residual):
+            matches.append(student)
+    matches.sort(key=lambda s: s.student_roll)
+    if perf.enabled:
+        perf.count("query_full_scans" if plan.access.startswith("full scan") else "query_index_plans")
+        perf.count("query_rows_examined", examined)
+    explain = {
+        "plan": plan.access,
+        "estimated_rows": plan.estimate,
+        "alternatives": {p.access: p.estimate for p in alternatives if p is not plan},
+        "index_predicates": [repr(p) for p in plan.covered],
+        "residual_predicates": [repr(p) for p in residual],
+        "rows_examined": examined,
+        "rows_matched": len(matches),
+    }
+    return matches[:limit], explain
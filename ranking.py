@@ -0,0 +1,61 @@
+from bisect import bisect_left, bisect_right, insort
+from stats import GROUPINGS
+
+
+# Students ordered by CGPA (highest first, ties by roll) for the whole roster
+# and for each dept, semester and dept/semester pair. Entries are
+# (-cgpa, roll) tuples in bisect-sorted lists, one tuple per student shared by
+# every list it is in, so top-K is a slice and rank-of a binary search.
+class RankIndex:
+    def __init__(self):
+        self.groups = {grouping: {} for grouping in GROUPINGS}
+        self.entries = {}
+
+    @classmethod
+    def from_students(cls, students):
+        index = cls()
+        for s in students:
+            entry = index.entries[s.student_roll] = (-float(s.cgpa), s.student_roll)
+            for grouping, key_of in GROUPINGS.items():
+                index.groups[grouping].setdefault(key_of(s), []).append(entry)
+        for groups in index.groups.values():
+            for entries in groups.values():
+                entries.sort()
+        return index
+
+    def add(self, student):
+        entry = self.entries[student.student_roll] = (-float(student.cgpa), student.student_roll)
+        for grouping, key_of in GROUPINGS.items():
+            insort(self.groups[grouping].setdefault(key_of(student), []), entry)
+
+    def remove(self, student):
+        entry = self.entries.pop(student.student_roll, None)
+        if entry is None:
+            return
+        for grouping, key_of in GROUPINGS.items():
+            groups = self.groups[grouping]
+            key = key_of(student)
+            entries = groups.get(key, [])
+            i = bisect_left(entries, entry)
+            if i < len(entries) and entries[i] == entry:
+                del entries[i]
+            if not entries:
+                groups.pop(key, None)
+
+    # grouping is a GROUPINGS key and key the group within it (None, "All" for the whole roster)
+    def group(self, grouping=None, key="All"):
+        return self.groups[grouping].get(key, [])
+
+    def top(self, k, grouping=None, key="All"):
+        return [roll for _, roll in self.group(grouping, key)[:k]]
+
+    # 1-based rank by CGPA within the group (equal CGPAs share a rank),
+    # the group size, and the percentage of the group with a lower CGPA
+    def rank_of(self, student, grouping=None):
+        entries = self.group(grouping, GROUPINGS[grouping](student))
+        entry = self.entries.get(student.student_roll)
+        if entry is None or not entries:
+            return None
+        higher = bisect_left(entries, (entry[0],))
+        lower = len(entries) - bisect_right(entries, (entry[0], float("inf")))
+        return {"rank": higher + 1, "of": len(entries), "percentile": round(lower / len(entries) * 100, 2)}
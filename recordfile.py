@@ -0,0 +1,196 @@
+import mmap
+import os
+import struct
+import zlib
+import perf
+from models import Student, dept_name
+from storage import GENERATIONS, CorruptDatabaseError, fsync_dir, rotate_generations, warn
+
+# Binary roster file, read through mmap so nothing is parsed up front:
+#   header     magic, format version, record count and where each part starts
+#   depts      the dept names, length-prefixed; records hold an index into them
+#   records    one fixed-width RECORD per student, in roster order
+#   directory  (roll, record number) pairs sorted by roll, for binary search
+#   emails     (CRC-32 of the lower-cased email, record number) pairs sorted the same way
+#   heap       name, email and phone strings, each prefixed with its length
+# Integers are little-endian, strings UTF-8. A roll lookup reads ~20 directory
+# entries and decodes one record.
+
+MAGIC = b"STUDREC1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIIQQQQQ")  # magic, version, unused, students, depts, offsets of depts/records/directory/emails/heap
+RECORD = struct.Struct("<IdHBxIII")  # roll, cgpa, dept number, semester, heap offsets of name/email/phone
+ENTRY = struct.Struct("<II")  # roll or email hash, record number
+LENGTH = struct.Struct("<H")
+
+
+def email_hash(email):
+    return zlib.crc32(email.lower().encode())
+
+
+def encode(students):
+    depts = {}  # dept -> its number in the dept table
+    heap = bytearray()
+
+    def string(text):
+        offset = len(heap)
+        data = text.encode()
+        heap.extend(LENGTH.pack(len(data)))
+        heap.extend(data)
+        return offset
+
+    records = bytearray()
+    for s in students:
+        dept = depts.setdefault(s.dept, len(depts))
+        records.extend(RECORD.pack(s.student_roll, s.cgpa, dept, s.semester, string(s.name), string(s.email), string(s.phone)))
+    table = bytearray()
+    for dept in depts:
+        data = dept.encode()
+        table.extend(LENGTH.pack(len(data)))
+        table.extend(data)
+    order = sorted(range(len(students)), key=lambda i: students[i].student_roll)
+    directory = b"".join(ENTRY.pack(students[i].student_roll, i) for i in order)
+    emails = b"".join(ENTRY.pack(*entry) for entry in sorted((email_hash(s.email), i) for i, s in enumerate(students)))
+
+    depts_at = HEADER.size
+    records_at = depts_at + len(table)
+    directory_at = records_at + len(records)
+    emails_at = directory_at + len(directory)
+    heap_at = emails_at + len(emails)
+    header = HEADER.pack(MAGIC, VERSION, 0, len(students), len(depts), depts_at, records_at, directory_at, emails_at, heap_at)
+    return b"".join((header, table, records, directory, emails, heap))
+
+
+def write_record_file(path, students, generations=GENERATIONS):
+    # Same swap-in as the JSON snapshot: written aside, synced, then renamed over
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        file.write(encode(students))
+        file.flush()
+        os.fsync(file.fileno())
+        if perf.enabled:
+            perf.count("bytes_written", file.tell())
+            perf.count("fsyncs")
+    if generations and os.path.exists(path):
+        rotate_generations(path, generations)
+    os.replace(tmp, path)
+    fsync_dir(path)
+
+
+class RecordFile:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size < HEADER.size:
+                raise CorruptDatabaseError(f"{path} is too short to be a record file.")
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, _, self.count, dept_count, depts_at,
+         self.records_at, self.directory_at, self.emails_at, self.heap_at) = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise CorruptDatabaseError(f"{path} is not a version {VERSION} student record file.")
+        if (self.directory_at != self.records_at + self.count * RECORD.size or self.emails_at != self.directory_at + self.count * ENTRY.size
+                or self.heap_at != self.emails_at + self.count * ENTRY.size or self.heap_at > size):
+            self.close()
+            raise CorruptDatabaseError(f"{path} is truncated or corrupt.")
+        self.depts = []
+        offset = depts_at
+        for _ in range(dept_count):
+            name, offset = self.string(offset)
+            self.depts.append(dept_name(name))
+
+    def __len__(self):
+        return self.count
+
+    def string(self, offset):
+        (length,) = LENGTH.unpack_from(self.map, offset)
+        start = offset + LENGTH.size
+        return self.map[start:start + length].decode(), start + length
+
+    def record(self, number):
+        roll, cgpa, dept, semester, name, email, phone = RECORD.unpack_from(self.map, self.records_at + number * RECORD.size)
+        heap = self.heap_at
+        return Student(self.string(heap + name)[0], roll, cgpa, self.string(heap + email)[0], self.depts[dept], semester, self.string(heap + phone)[0])
+
+    # Roll and record number of the position-th student in roll order
+    def entry(self, position):
+        return ENTRY.unpack_from(self.map, self.directory_at + position * ENTRY.size)
+
+    # Position in the directory of the first roll >= roll
+    def bisect(self, roll, at=None):
+        at = self.directory_at if at is None else at
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if ENTRY.unpack_from(self.map, at + middle * ENTRY.size)[0] < roll:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    # Position of roll in the directory, or None if it isn't there
+    def locate(self, roll):
+        position = self.bisect(roll)
+        if position < self.count and self.entry(position)[0] == roll:
+            return position
+        return None
+
+    def find(self, roll):
+        position = self.locate(roll)
+        return self.record(self.entry(position)[1]) if position is not None else None
+
+    # Students with this email (compared ignoring case); normally one at most
+    def find_email(self, email):
+        email = email.lower()
+        key = email_hash(email)
+        position = self.bisect(key, self.emails_at)
+        while position < self.count:
+            found, number = ENTRY.unpack_from(self.map, self.emails_at + position * ENTRY.size)
+            if found != key:
+                return
+            s = self.record(number)
+            if s.email.lower() == email:
+                yield s
+            position += 1
+
+    # (roll, record number) in roll order, rolls low..high inclusive
+    def entries(self, low=None, high=None):
+        position = self.bisect(low) if low is not None else 0
+        while position < self.count:
+            roll, number = self.entry(position)
+            if high is not None and roll > high:
+                return
+            yield roll, number
+            position += 1
+
+    def rolls(self):
+        for number in range(self.count):
+            yield RECORD.unpack_from(self.map, self.records_at + number * RECORD.size)[0]
+
+    # Every student in roster order, except rolls in skip
+    def students(self, skip=()):
+        for number, roll in enumerate(self.rolls()):
+            if roll not in skip:
+                yield self.record(number)
+
+    def close(self):
+        self.map.close()
+
+
+# The newest readable generation, like read_snapshot; None if there is no file yet
+def open_record_file(path, generations=GENERATIONS):
+    candidates = [path] + [f"{path}.{i}" for i in range(1, generations + 1)]
+    existing = [c for c in candidates if os.path.exists(c)]
+    if not existing:
+        return None
+    for candidate in existing:
+        try:
+            records = RecordFile(candidate)
+        except (CorruptDatabaseError, ValueError, OSError):
+            warn(f"{candidate} is unreadable or corrupt, skipping it.")
+            continue
+        if candidate != path:
+            warn(f"recovered data from {candidate}.")
+        return records
+    raise CorruptDatabaseError(f"{path} and all of its backups are corrupt.")
@@ -0,0 +1,110 @@
+import gzip
+import json
+from json.encoder import encode_basestring_ascii
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# JSON encoding for snapshots and journal entries. The fastest library that is
+# installed does the work (orjson, then ujson, then the standard library); they
+# all read and write the same JSON, so files move freely between machines.
+#
+# Snapshot layouts, all read back whatever the store is set to write:
+#   compact  a JSON array with one record per line (the default); it is read
+#            back a line at a time, without a general streaming parser
+#   pretty   the indented layout written by older versions
+#   gzip     compact, compressed with gzip; recognised on reading by its magic bytes
+FORMATS = ("compact", "pretty", "gzip")
+DEFAULT_FORMAT = "compact"
+GZIP_LEVEL = 3  # twice as fast as the default 6 for a file about 15% larger
+GZIP_MAGIC = b"\x1f\x8b"
+BATCH = 1024  # records encoded per write
+
+# One Student as a JSON object, formatted straight from its attributes
+STUDENT_JSON = '{"name":%s,"roll":%d,"cgpa":%r,"email":%s,"dept":%s,"semester":%d,"phone":%s}'
+NUMBERS = (int, float)
+DECODER = json.JSONDecoder()
+
+
+def json_dumps(obj):
+    return json.dumps(obj, separators=(",", ":"))
+
+
+# json.loads without its per-call checks: a third faster on many short lines
+def json_loads(text):
+    if type(text) is bytes:
+        text = text.decode()
+    value, end = DECODER.raw_decode(text)
+    if end != len(text) and text[end:].strip():
+        raise ValueError("Extra data after the JSON value")
+    return value
+
+
+def student_json(s):
+    if type(s.cgpa) not in NUMBERS:
+        return json_dumps(s.to_dict())  # %r would quote it the Python way
+    return STUDENT_JSON % (encode_basestring_ascii(s.name), s.student_roll, s.cgpa, encode_basestring_ascii(s.email),
+                           encode_basestring_ascii(s.dept), s.semester, encode_basestring_ascii(s.phone))
+
+
+# Batches of records (Students, or plain dicts) as the record lines of a compact snapshot
+def json_batch(records):
+    return ",\n".join([json_dumps(r) if type(r) is dict else student_json(r) for r in records]).encode()
+
+
+def orjson_batch(records):
+    return b",\n".join([orjson.dumps(r if type(r) is dict else r.to_dict()) for r in records])
+
+
+def ujson_batch(records):
+    return ",\n".join([ujson.dumps(r if type(r) is dict else r.to_dict()) for r in records]).encode()
+
+
+# name -> (dumps to str, loads from str or bytes, batch encoder)
+ENGINES = {"json": (json_dumps, json_loads, json_batch)}
+if ujson is not None:
+    ENGINES["ujson"] = (ujson.dumps, ujson.loads, ujson_batch)
+if orjson is not None:
+    ENGINES["orjson"] = (lambda obj: orjson.dumps(obj).decode(), orjson.loads, orjson_batch)
+
+
+def use(name):
+    global engine, dumps, loads, encode_batch
+    dumps, loads, encode_batch = ENGINES[name]
+    engine = name
+
+
+use(list(ENGINES)[-1])
+
+
+def write_array(file, records, fmt=DEFAULT_FORMAT):
+    # records is a list; file is open for writing bytes
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown snapshot format {fmt!r}; use one of {', '.join(FORMATS)}")
+    if fmt == "pretty":
+        file.write(json.dumps([r if type(r) is dict else r.to_dict() for r in records], indent=4).encode())
+        return
+    out = gzip.GzipFile(fileobj=file, mode="wb", compresslevel=GZIP_LEVEL, mtime=0) if fmt == "gzip" else file
+    out.write(b"[\n")
+    for start in range(0, len(records), BATCH):
+        if start:
+            out.write(b",\n")
+        out.write(encode_batch(records[start:start + BATCH]))
+    out.write(b"\n]\n" if records else b"]\n")
+    if out is not file:
+        out.close()  # writes the gzip trailer; file itself stays open
+
+
+# Text stream over a snapshot, decompressed if it is gzipped
+def open_snapshot(path):
+    with open(path, "rb") as file:
+        magic = file.read(2)
+    if magic == GZIP_MAGIC:
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import traceback
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+import perf
+from changefeed import FeedTrimmedError
+from query import QueryError
+from storage import ConflictError
+from validations import MESSAGES, ValidationError
+
+# A small HTTP/1.1 JSON service over one preloaded StudentManager, on asyncio
+# streams from the standard library:
+#   GET    /students/<roll>                       one student
+#   GET    /students?name=|email=|roll=|q=&limit=  search, or a query (see query.py)
+#   GET    /students?name=&fuzzy=1&limit=           names spelled or sounding alike (see fuzzy.py)
+#   POST   /students                              add (JSON body with every field)
+#   PATCH  /students/<roll>                       update (JSON body with the fields to change)
+#   DELETE /students/<roll>                       delete
+#   GET    /stats?by=dept|semester|dept,semester   CGPA statistics
+#   GET    /changes?since=N&limit=                 the change feed after N, as JSON Lines
+# Reads are answered straight from the in-memory indexes. Writes are queued to
+# one writer task, which applies whatever has queued up under a single store
+# lock and syncs the journal once for the batch before answering any of them.
+
+MAX_BODY = 1024 * 1024
+MAX_BATCH = 256
+CHANGES_LIMIT = 10_000  # most changes in one /changes response; clients ask again from the last one
+PERF_EVERY = 15  # seconds between reports to the perf sinks, when instrumentation is on
+REASONS = {
+    200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 410: "Gone", 411: "Length Required", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+STUDENT_FIELDS = ("name", "roll", "cgpa", "email", "dept", "semester", "phone")
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def read_request(reader):
+    # (method, target, keep_alive, body), or None once the client has closed the connection
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HttpError(400, "Malformed request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", ""):
+        raise HttpError(411, "Send a Content-Length instead of a chunked body")
+    length = headers.get("content-length", "0")
+    if not length.isdigit():
+        raise HttpError(400, "Bad Content-Length")
+    length = int(length)
+    if length > MAX_BODY:
+        raise HttpError(413, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+    # HTTP/1.1 connections stay open unless the client says otherwise; 1.0 ones only on request
+    connection = headers.get("connection", "").lower()
+    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+    return method.upper(), target, keep_alive, body
+
+
+# payload is encoded as JSON; bytes are sent as they are, as JSON Lines
+def response(status, payload, keep_alive):
+    lines = isinstance(payload, bytes)
+    body = payload if lines else json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: {'application/x-ndjson' if lines else 'application/json'}\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+# The limit query parameter: a whole number from 0 up, or default when absent
+def limit_param(params, default=None):
+    text = params.get("limit")
+    if not text:
+        return default
+    try:
+        limit = int(text)
+    except ValueError:
+        raise HttpError(400, "limit must be a whole number")
+    if limit < 0:
+        raise HttpError(400, "limit can't be negative")
+    return limit
+
+
+def json_object(body):
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        raise HttpError(400, "Body is not valid JSON")
+    if not isinstance(data, dict):
+        raise HttpError(400, "Body must be a JSON object")
+    return data
+
+
+class StudentServer:
+    def __init__(self, manager):
+        self.manager = manager
+        self.writes = None
+
+    async def serve(self, host="127.0.0.1", port=8000):
+        self.writes = asyncio.Queue()
+        tasks = [asyncio.create_task(self.write_loop())]
+        if perf.enabled and perf.sinks:
+            tasks.append(asyncio.create_task(self.perf_loop()))
+        server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving {self.manager.filename} on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # One connection: requests are answered in order until the client closes it
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    method, target, keep_alive, body = request
+                    status, payload = await self.dispatch(method, target, body)
+                except HttpError as e:
+                    status, payload = e.status, {"error": str(e)}
+                writer.write(response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, method, target, body):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if parts == ["stats"]:
+                if method != "GET":
+                    raise HttpError(405, "Use GET")
+                return 200, self.stats(params.get("by"))
+            if parts == ["changes"]:
+                if method != "GET":
+                    raise HttpError(405, "Use GET")
+                return 200, self.changes(params)
+            if parts == ["students"]:
+                if method == "GET":
+                    return 200, self.search(params)
+                if method == "POST":
+                    values = json_object(body)
+                    missing = [field for field in STUDENT_FIELDS if field not in values]
+                    if missing:
+                        raise HttpError(400, f"Missing fields: {', '.join(missing)}")
+                    return 201, await self.write(lambda: self.manager.create_student(**{f: values[f] for f in STUDENT_FIELDS}))
+                raise HttpError(405, "Use GET or POST")
+            if len(parts) == 2 and parts[0] == "students" and parts[1].isdigit():
+                roll = int(parts[1])
+                if method == "GET":
+                    self.manager.refresh()
+                    student = self.manager.get_student(roll)
+                    result = student.to_dict() if student is not None else None
+                elif method in ("PATCH", "PUT"):
+                    changes = json_object(body)
+                    if "roll" in changes:
+                        raise HttpError(400, "The roll of a student can't be changed")
+                    result = await self.write(lambda: self.manager.modify_student(roll, **changes))
+                elif method == "DELETE":
+                    result = await self.write(lambda: self.manager.remove_student(roll))
+                else:
+                    raise HttpError(405, "Use GET, PATCH or DELETE")
+                if result is None:
+                    raise HttpError(404, f"Student {roll} not found")
+                return 200, result
+            raise HttpError(404, "No such endpoint")
+        except ValidationError as e:
+            return 400, {"errors": [MESSAGES[code] for code in e.codes]}
+        except (QueryError, TypeError, ValueError) as e:
+            return 400, {"error": str(e)}
+        except ConflictError as e:
+            return 409, {"error": str(e)}
+        except FeedTrimmedError as e:
+            return 410, {"error": str(e), "first": e.first}
+        except HttpError:
+            raise
+        except Exception:
+            # A bug or a failing store shouldn't take the connection down with it
+            traceback.print_exc()
+            return 500, {"error": "Internal server error"}
+
+    def search(self, params):
+        self.manager.refresh()
+        limit = limit_param(params)
+        if params.get("q"):
+            students = self.manager.query(params["q"], limit)
+        elif params.get("name") and params.get("fuzzy") in ("1", "true"):
+            students = self.manager.find_similar_names(params["name"], limit or 10)
+        elif any(params.get(key) for key in ("roll", "name", "email")):
+            students = self.manager.find_students(params.get("roll"), params.get("name"), params.get("email"), limit)
+        else:
+            raise HttpError(400, "Give one of roll, name, email or q")
+        return [s.to_dict() for s in students]
+
+    def changes(self, params):
+        since = int(params.get("since") or 0)
+        limit = min(limit_param(params, CHANGES_LIMIT), CHANGES_LIMIT)
+        return b"".join(islice(self.manager.feed.lines(since), limit))
+
+    def stats(self, by):
+        if by not in (None, "dept", "semester", "dept,semester"):
+            raise HttpError(400, "by must be dept, semester or dept,semester")
+        self.manager.refresh()
+        return [{"group": key, **values} for key, values in self.manager.cgpa_stats(by).items()]
+
+    # Queue a mutation for the writer task; its result (a Student, or None) comes
+    # back as a dict once the batch it was part of is on disk
+    async def write(self, action):
+        future = asyncio.get_running_loop().create_future()
+        await self.writes.put((action, future))
+        return await future
+
+    async def write_loop(self):
+        while True:
+            batch = [await self.writes.get()]
+            while len(batch) < MAX_BATCH and not self.writes.empty():
+                batch.append(self.writes.get_nowait())
+            outcomes = []
+            try:
+                with self.manager.backend.lock():
+                    self.manager.refresh()
+                    for action, future in batch:
+                        try:
+                            result = action()
+                            outcomes.append((future, result.to_dict() if result is not None else None, None))
+                        except Exception as e:
+                            outcomes.append((future, None, e))
+                    self.manager.backend.sync()
+            except Exception as e:
+                # The store couldn't be read or synced: nothing in this batch is
+                # known to be on disk, so it all fails, and the next batch tries again
+                outcomes = [(future, None, e) for _, future in batch]
+            for future, result, error in outcomes:
+                if future.cancelled():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+
+    async def perf_loop(self):
+        while True:
+            await asyncio.sleep(PERF_EVERY)
+            perf.emit()
+
+
+def serve(manager, host="127.0.0.1", port=8000):
+    try:
+        asyncio.run(StudentServer(manager).serve(host, port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,38 @@
+from bisect import bisect_left, bisect_right, insort
+
+
+# Keys kept in ascending order with bisect, for ordered listing, paging and
+# range queries without sorting the roster each time
+class SortedIndex:
+    def __init__(self, keys=()):
+        self.keys = sorted(keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, key):
+        insort(self.keys, key)
+
+    # Appending a run and re-sorting is linear for timsort, unlike one insort per key
+    def add_many(self, keys):
+        self.keys.extend(keys)
+        self.keys.sort()
+
+    def remove(self, key):
+        i = bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            del self.keys[i]
+
+    # Keys with low <= key <= high (either bound may be None), then offset/limit within them
+    def range(self, low=None, high=None, offset=0, limit=None):
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        start = min(start + offset, end)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.keys[start:end]
+
+    def count(self, low=None, high=None):
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return max(end - start, 0)
@@ -0,0 +1,180 @@
+from array import array
+from bisect import bisect_left, insort
+
+BIN_WIDTH = 0.5  # CGPA histogram bins: 0.0-0.5, 0.5-1.0, ... 3.5-4.0
+BINS = 8
+PERCENTILES = (25, 50, 75, 90)
+NUMPY_MIN_ROWS = 1024
+
+GROUPINGS = {
+    None: lambda s: "All",
+    "dept": lambda s: s.dept,
+    "semester": lambda s: s.semester,
+    "dept,semester": lambda s: (s.dept, s.semester),
+}
+
+
+def bin_of(cgpa):
+    return min(max(int(cgpa / BIN_WIDTH), 0), BINS - 1)
+
+
+def bin_labels():
+    return [f"{i * BIN_WIDTH:.1f}-{(i + 1) * BIN_WIDTH:.1f}" for i in range(BINS)]
+
+
+def percentile(ordered, p):
+    # Linear interpolation between closest ranks, the same as numpy.percentile's default
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def group_order(key):
+    # Semesters (numbers) first in order, then depts by name
+    if isinstance(key, tuple):
+        return tuple(group_order(k) for k in key)
+    if isinstance(key, int):
+        return (0, key, "")
+    return (1, 0, key)
+
+
+# ordered supports len(), indexing and pct(p) gives the p-th percentile
+def summary(ordered, total, histogram, pct, percentiles):
+    count = len(ordered)
+    # Interpolated values carry float noise (3.5999999999999996); round them like the mean
+    def rounded(p):
+        value = pct(p)
+        return round(float(value), 4) if value is not None else None
+    result = {
+        "count": count,
+        "mean": round(total / count, 4) if count else None,
+        "median": rounded(50),
+        "min": float(ordered[0]) if count else None,
+        "max": float(ordered[-1]) if count else None,
+    }
+    for p in percentiles:
+        result[f"p{p}"] = rounded(p)
+    result["histogram"] = dict(zip(bin_labels(), histogram))
+    return result
+
+
+# Running CGPA aggregates for one group: count, sum, the values in order
+# (for median and percentiles) and the histogram, all updated per change
+class GroupStats:
+    __slots__ = ("count", "total", "values", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.values = []
+        self.histogram = [0] * BINS
+
+    def add(self, cgpa):
+        self.count += 1
+        self.total += cgpa
+        insort(self.values, cgpa)
+        self.histogram[bin_of(cgpa)] += 1
+
+    def remove(self, cgpa):
+        i = bisect_left(self.values, cgpa)
+        if i == len(self.values) or self.values[i] != cgpa:
+            return
+        del self.values[i]
+        self.count -= 1
+        self.total -= cgpa
+        self.histogram[bin_of(cgpa)] -= 1
+
+    def summary(self, percentiles=PERCENTILES):
+        return summary(self.values, self.total, self.histogram, lambda p: percentile(self.values, p), percentiles)
+
+
+# CGPA statistics for the whole roster and grouped by dept, semester and both,
+# kept current by the manager so a report costs O(groups) rather than O(n)
+class StatsEngine:
+    def __init__(self):
+        self.groups = {grouping: {} for grouping in GROUPINGS}
+
+    @classmethod
+    def from_students(cls, students):
+        # Built in bulk: collect each group's values, then sort once
+        engine = cls()
+        for s in students:
+            cgpa = float(s.cgpa)
+            for grouping, key_of in GROUPINGS.items():
+                group = engine.groups[grouping].get(key_of(s))
+                if group is None:
+                    group = engine.groups[grouping][key_of(s)] = GroupStats()
+                group.count += 1
+                group.total += cgpa
+                group.values.append(cgpa)
+                group.histogram[bin_of(cgpa)] += 1
+        for groups in engine.groups.values():
+            for group in groups.values():
+                group.values.sort()
+        return engine
+
+    def add(self, student):
+        cgpa = float(student.cgpa)
+        for grouping, key_of in GROUPINGS.items():
+            groups = self.groups[grouping]
+            key = key_of(student)
+            if key not in groups:
+                groups[key] = GroupStats()
+            groups[key].add(cgpa)
+
+    def remove(self, student):
+        cgpa = float(student.cgpa)
+        for grouping, key_of in GROUPINGS.items():
+            groups = self.groups[grouping]
+            key = key_of(student)
+            group = groups.get(key)
+            if group is None:
+                continue
+            group.remove(cgpa)
+            if not group.count:
+                del groups[key]
+
+    def report(self, by=None, percentiles=PERCENTILES):
+        groups = self.groups[by]
+        return {key: groups[key].summary(percentiles) for key in sorted(groups, key=group_order)}
+
+
+# One-pass statistics over any iterable of students, for rosters that aren't
+# held in memory. CGPAs are gathered into typed arrays per group; with NumPy
+# installed large groups are summarised by it, otherwise in plain Python.
+def compute_stats(students, by=None, percentiles=PERCENTILES):
+    key_of = GROUPINGS[by]
+    columns = {}
+    for s in students:
+        key = key_of(s)
+        column = columns.get(key)
+        if column is None:
+            column = columns[key] = array("d")
+        column.append(float(s.cgpa))
+
+    np = None
+    if any(len(column) >= NUMPY_MIN_ROWS for column in columns.values()):
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+
+    report = {}
+    for key in sorted(columns, key=group_order):
+        column = columns[key]
+        if np is not None and len(column) >= NUMPY_MIN_ROWS:
+            values = np.sort(np.frombuffer(column, dtype=float))
+            bins = np.clip((values / BIN_WIDTH).astype(int), 0, BINS - 1)
+            histogram = np.bincount(bins, minlength=BINS).tolist()
+            result = summary(values, float(values.sum()), histogram, lambda p: float(np.percentile(values, p)), percentiles)
+        else:
+            ordered = sorted(column)
+            histogram = [0] * BINS
+            for cgpa in ordered:
+                histogram[bin_of(cgpa)] += 1
+            result = summary(ordered, sum(ordered), histogram, lambda p: percentile(ordered, p), percentiles)
+        report[key] = result
+    return report
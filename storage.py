@@ -0,0 +1,330 @@
+import json
+import os
+import re
+import shutil
+import sys
+import zlib
+from contextlib import contextmanager
+import perf
+import serializer
+
+try:
+    import fcntl
+except ImportError:  # Windows has no advisory locks; the store is then single-process only
+    fcntl = None
+
+GENERATIONS = 3  # previous snapshots kept as students_db.json.1, .2, ...
+
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+# Recovery notices go to stderr so they never mix with command output on stdout
+def warn(message):
+    print(f"Warning: {message}", file=sys.stderr)
+
+
+class CorruptDatabaseError(Exception):
+    pass
+
+
+# Raised when a record was changed by another process after it was read
+class ConflictError(Exception):
+    pass
+
+
+# Raised when a snapshot turns out to be corrupt after some records were already
+# yielded; `skip` is how many candidate files to pass over when starting again
+class PartialSnapshotError(CorruptDatabaseError):
+    def __init__(self, message, skip):
+        super().__init__(message)
+        self.skip = skip
+
+
+# records are Students or plain dicts; fmt is one of serializer.FORMATS
+def write_snapshot(path, records, generations=GENERATIONS, fmt=serializer.DEFAULT_FORMAT):
+    # Write the new snapshot beside the old one and only swap it in once it is on disk
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as file:
+        serializer.write_array(file, records, fmt)
+        file.flush()
+        os.fsync(file.fileno())
+        if perf.enabled:
+            perf.count("bytes_written", file.tell())
+            perf.count("fsyncs")
+    if generations and os.path.exists(path):
+        rotate_generations(path, generations)
+    os.replace(tmp, path)
+    fsync_dir(path)
+
+
+def rotate_generations(path, generations):
+    for i in range(generations - 1, 0, -1):
+        older = f"{path}.{i}"
+        if os.path.exists(older):
+            os.replace(older, f"{path}.{i + 1}")
+    # Link rather than rename so the live file never disappears during the swap
+    try:
+        os.link(path, path + ".1")
+    except OSError:
+        shutil.copy2(path, path + ".1")
+
+
+def fsync_dir(path):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return  # directories can't be opened on Windows
+    try:
+        os.fsync(fd)
+        if perf.enabled:
+            perf.count("fsyncs")
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def iter_json_array(file, chunk_size=CHUNK_SIZE):
+    # Parse a top-level JSON array one element at a time, holding only a chunk of text
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    expect = "["
+    while True:
+        pos = WHITESPACE.match(buffer, pos).end()
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("Unexpected end of JSON array")
+            chunk = file.read(chunk_size)
+            buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+            continue
+
+        char = buffer[pos]
+        if expect == "[":
+            if char != "[":
+                raise ValueError("Expected a JSON array")
+            pos += 1
+            expect = "value or ]"
+        elif expect == "value or ]" and char == "]":
+            return
+        elif expect.startswith("value"):
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+                # A bare number cut at the buffer edge may continue in the next chunk
+                complete = eof or (end < len(buffer) and buffer[end] in " \t\n\r,]")
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                # The element runs past the buffered text; read more and try again
+                chunk = file.read(chunk_size)
+                buffer, pos, eof = buffer[pos:] + chunk, 0, not chunk
+                continue
+            yield value
+            pos = end
+            expect = ", or ]"
+        elif char == ",":
+            pos += 1
+            expect = "value"
+        elif char == "]":
+            return
+        else:
+            raise ValueError(f"Expected ',' or ']' in JSON array, found {char!r}")
+
+
+def iter_records(file):
+    # Compact snapshots hold one record per line and are read a line at a time;
+    # other layouts (indented files from older versions, hand edits) go through
+    # the general parser above
+    first, line = file.readline(), file.readline()
+    if first.strip() != "[" or not line.startswith("{"):
+        file.seek(0)
+        yield from iter_json_array(file)
+        return
+    done = 0
+    while line:
+        text = line.rstrip()
+        if text == "]":
+            return
+        try:
+            record = serializer.loads(text[:-1] if text.endswith(",") else text)
+        except ValueError:
+            break  # a record split over lines (indent=0, hand edits): not one per line after all
+        yield record
+        done += 1
+        line = file.readline()
+    # Start over with the general parser, passing the records already yielded;
+    # a file that really is corrupt fails there too
+    file.seek(0)
+    for number, record in enumerate(iter_json_array(file)):
+        if number >= done:
+            yield record
+
+
+def read_snapshot(path, generations=GENERATIONS, skip=0):
+    # Yield records one at a time from the newest readable generation
+    candidates = [path] + [f"{path}.{i}" for i in range(1, generations + 1)]
+    existing = [c for c in candidates if os.path.exists(c)]
+    if not existing:
+        return
+    for number, candidate in enumerate(existing[skip:], start=skip):
+        yielded = False
+        try:
+            with serializer.open_snapshot(candidate) as file:
+                for record in iter_records(file):
+                    if not yielded and candidate != path:
+                        warn(f"recovered data from {candidate}.")
+                    yielded = True
+                    yield record
+            return
+        except (ValueError, IOError, EOFError, zlib.error):
+            warn(f"{candidate} is unreadable or corrupt, skipping it.")
+            if yielded:
+                raise PartialSnapshotError(f"{candidate} is corrupt.", number + 1)
+    raise CorruptDatabaseError(f"{path} and all of its backups are corrupt.")
+
+
+# Identifies one version of a file: a rewrite through os.replace gets a new inode
+def file_identity(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# Advisory lock on <store>.lock shared by every process using the store: held
+# exclusively around writes and shared while reading. The lock file also holds
+# the store version, a counter bumped on every write, so a process can tell
+# with one small read whether anyone else has changed the store.
+# Nested use within a process reuses the lock that is already held.
+class StoreLock:
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.depth = 0
+        self.exclusive = False
+
+    @contextmanager
+    def __call__(self, exclusive=True):
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None and (not self.depth or exclusive and not self.exclusive):
+            fcntl.flock(self.fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self.exclusive = exclusive
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            # close() inside the block already released the lock with the file
+            if not self.depth and fcntl is not None and self.fd is not None:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+            if not self.depth:
+                self.exclusive = False
+
+    def version(self):
+        if self.fd is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        text = os.read(self.fd, 32).strip()
+        return int(text) if text.isdigit() else 0
+
+    # Only called with the exclusive lock held
+    def bump(self, by=1):
+        version = self.version() + by
+        os.lseek(self.fd, 0, os.SEEK_SET)
+        os.write(self.fd, b"%d\n" % version)
+        return version
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+# Append-only JSON-lines log of mutations, kept next to the snapshot file
+class Journal:
+    def __init__(self, path, fsync_every=32):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.pending = 0
+        self.file = None
+        self.size = os.path.getsize(path) if os.path.exists(path) else 0
+
+    # Writers hold the store lock, so appends from several processes never interleave
+    def append(self, op, **data):
+        if self.file is not None and self.replaced():
+            self.close()
+        if self.file is None:
+            self.open()
+        line = serializer.dumps({"op": op, **data}) + "\n"
+        self.file.write(line)
+        # Hand every entry to the OS right away; only the fsync is batched
+        self.file.flush()
+        if perf.enabled:
+            perf.count("bytes_written", len(line.encode()))
+        self.size = self.file.tell()
+        self.pending += 1
+        if self.pending >= self.fsync_every:
+            self.sync()
+
+    # Another process folded the journal into the snapshot and removed it
+    # since this handle was opened; appends must go to the new file
+    def replaced(self):
+        identity = file_identity(self.path)
+        return identity is None or identity[0] != os.fstat(self.file.fileno()).st_ino
+
+    def open(self):
+        self.file = open(self.path, "a", encoding="utf-8")
+        end = self.file.tell()
+        if not end:
+            return
+        # A torn entry left by a crash would swallow the next one; cut it off first
+        with open(self.path, "rb") as file:
+            file.seek(max(0, end - CHUNK_SIZE))
+            tail = file.read()
+        if not tail.endswith(b"\n"):
+            self.file.truncate(end - len(tail) + tail.rfind(b"\n") + 1)
+            self.file.seek(0, os.SEEK_END)
+
+    def sync(self):
+        if self.file is not None and self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+            if perf.enabled:
+                perf.count("fsyncs")
+
+    # Entries from byte offset on; self.end is left just past the last whole entry read
+    def replay(self, offset=0):
+        self.end = offset
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as file:
+            file.seek(offset)
+            for line in file:
+                try:
+                    entry = serializer.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-append; nothing after it is valid
+                    return
+                if not line.endswith(b"\n"):
+                    return
+                self.end += len(line)
+                if perf.enabled:
+                    perf.count("journal_entries_read")
+                yield entry
+
+    def reset(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.size = 0
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
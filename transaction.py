@@ -0,0 +1,118 @@
+from models import Student
+from validations import MESSAGES, ValidationError, clean_input, validate_columns
+
+# A group of adds, updates and deletes committed together (see
+# StudentManager.transaction). Each change is checked like the matching
+# manager call when it is staged and kept here, leaving the roster alone;
+# commit() checks emails across the whole group and hands it to the backend as
+# one write. Leaving the block with an exception stages nothing at all.
+
+
+class TransactionError(ValidationError):
+    # errors maps roll -> error codes for each staged student that failed
+    def __init__(self, errors):
+        self.errors = errors
+        self.codes = sorted({code for codes in errors.values() for code in codes})
+        details = [f"{roll}: {', '.join(MESSAGES[code] for code in codes)}" for roll, codes in errors.items()]
+        ValueError.__init__(self, "; ".join(details))
+
+
+# The emails of an index that a transaction leaves with their students, plus extra ones
+class UntouchedEmails:
+    def __init__(self, index, changes, extra):
+        self.index = index
+        self.changes = changes
+        self.extra = extra
+
+    def __contains__(self, email):
+        if email in self.extra:
+            return True
+        s = self.index.get(email)
+        return s is not None and s.student_roll not in self.changes
+
+
+class Transaction:
+    def __init__(self, manager):
+        self.manager = manager
+        self.changes = {}  # roll -> the student as it will be saved, or None to delete it
+        self.original = {}  # roll -> the student before the transaction, None if it is new
+
+    # The student as the transaction has it so far
+    def get(self, roll):
+        roll = int(roll)
+        if roll in self.changes:
+            return self.changes[roll]
+        return self.manager.roll_index.get(roll)
+
+    def stage(self, roll, student, before):
+        self.original.setdefault(roll, before)
+        self.changes[roll] = student
+
+    def add(self, name, roll, cgpa, email, dept, semester, phone):
+        values = clean_input({
+            "name": name, "roll": roll, "cgpa": cgpa, "email": email,
+            "dept": dept, "semester": semester, "phone": phone
+        })
+        errors = validate_columns({field: [value] for field, value in values.items()})[0]
+        if not errors and self.get(values["roll"]) is not None:
+            errors.append("ROLL_EXISTS")
+        if errors:
+            raise ValidationError(errors)
+        student = Student.from_input(values)
+        self.stage(student.student_roll, student, None)
+        return student
+
+    # Like StudentManager.modify_student; returns the staged student, or None if the roll doesn't exist
+    def update(self, roll, **changes):
+        changes = {field: value for field, value in changes.items() if value is not None}
+        unknown = set(changes) - {"name", "cgpa", "email", "dept", "semester", "phone"}
+        if unknown:
+            raise TypeError(f"Cannot update: {', '.join(sorted(unknown))}")
+        s = self.get(roll)
+        if s is None or not changes:
+            return s
+        values = clean_input({**s.to_dict(), **changes})
+        errors = validate_columns({field: [values[field]] for field in changes})[0]
+        if errors:
+            raise ValidationError(errors)
+        return self.put(Student.from_input(values), s)
+
+    # Stage a student already known to be valid in place of before (its current version)
+    def put(self, student, before):
+        self.stage(student.student_roll, student, before)
+        return student
+
+    def delete(self, roll):
+        s = self.get(roll)
+        if s is not None and self.original.get(s.student_roll, s) is None:
+            # Added earlier in this transaction: there is nothing to save either way
+            del self.changes[s.student_roll], self.original[s.student_roll]
+        elif s is not None:
+            self.stage(s.student_roll, None, s)
+        return s
+
+    # Every new or changed email must be free once the whole group is applied:
+    # not used by a student the transaction leaves alone, nor twice within it
+    def check(self):
+        rows, kept = [], set()
+        for roll, s in self.changes.items():
+            if s is None:
+                continue
+            before = self.original[roll]
+            if before is None or s.email.lower() != before.email.lower():
+                rows.append(s)
+            else:
+                kept.add(s.email.lower())
+        if not rows:
+            return
+        existing = UntouchedEmails(self.manager.email_index, self.changes, kept)
+        errors = validate_columns({"email": [s.email for s in rows]}, existing_emails=existing)
+        failed = {s.student_roll: codes for s, codes in zip(rows, errors) if codes}
+        if failed:
+            raise TransactionError(failed)
+
+    def commit(self):
+        self.check()
+        if self.changes:
+            added = {roll for roll, s in self.original.items() if s is None}
+            self.manager.commit_changes(self.changes, added)
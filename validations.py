@@ -1,97 +1,283 @@
 import re
+from models import semester_label
 
-def validate_name(name: str) -> bool:
-    if not name:
-        print("Error: Name cannot be empty!")
-        return False
-    if any(char.isdigit() for char in name):
-        print("Error: Name cannot contain numbers!")
-        return False
-    if not all(char.isalpha() or char.isspace() for char in name):
-        print("Error: Name can contain only letters and spaces!")
-        return False
-    return True
+# Batch validation works on columns of raw text (as typed or as read from an
+# import file) and returns error codes per row without printing anything.
+# The validate_* functions used by the prompts are thin wrappers that run a
+# one-row batch and print the message for the first error.
 
-def validate_roll(sroll: str, students: list) -> bool:
-    if not sroll:
-        print("Error: Student Roll cannot be empty!")
-        return False
-    if not sroll.isdigit():
-        print("Error: Student Roll must be numeric!")
-        return False
-    if len(sroll) != 6:
-        print("Error: Student Roll must be 6 digits!")
-        return False
-    roll_int = int(sroll)
-    if roll_int <= 0:
-        print("Error: Student Roll must be positive!")
-        return False
-    if any(s.student_roll == roll_int for s in students):
-        print("Error: Student Roll already exists!")
+MESSAGES = {
+    "NAME_EMPTY": "Name cannot be empty!",
+    "NAME_DIGITS": "Name cannot contain numbers!",
+    "NAME_CHARS": "Name can contain only letters and spaces!",
+    "ROLL_EMPTY": "Student Roll cannot be empty!",
+    "ROLL_NOT_NUMERIC": "Student Roll must be numeric!",
+    "ROLL_LENGTH": "Student Roll must be 6 digits!",
+    "ROLL_NOT_POSITIVE": "Student Roll must be positive!",
+    "ROLL_EXISTS": "Student Roll already exists!",
+    "DEPT_EMPTY": "Dept. cannot be empty!",
+    "DEPT_DIGITS": "Dept cannot contain numbers!",
+    "DEPT_CHARS": "Dept can contain only letters and spaces!",
+    "EMAIL_EMPTY": "Email cannot be empty!",
+    "EMAIL_FORMAT": "Invalid email format! (Example: name@domain.com)",
+    "EMAIL_EXISTS": "Email already exists!",
+    "CGPA_EMPTY": "CGPA is needed!",
+    "CGPA_NOT_NUMBER": "CGPA must be a number!",
+    "CGPA_RANGE": "CGPA must be between 0.0 and 4.0!",
+    "PHONE_EMPTY": "Phone cannot be empty!",
+    "PHONE_NOT_NUMERIC": "Phone must be numeric!",
+    "PHONE_LENGTH": "Phone must be 11 digits!",
+    "PHONE_PREFIX": "Phone must start with 01!",
+    "SEMESTER_EMPTY": "Semester cannot be empty!",
+    "SEMESTER_NOT_NUMERIC": "Semester must be numeric!",
+    "SEMESTER_RANGE": "Semester must be between 1 and 8!",
+    "COUNT_NEGATIVE": "The number of students to show cannot be negative!",
+}
+
+FIELDS = ("name", "roll", "dept", "email", "cgpa", "phone", "semester")
+
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+# Fast path for plain names only; anything else gets the str.isalpha/isdigit checks
+LETTERS_PATTERN = re.compile(r'[A-Za-z ]+')
+PHONE_PATTERN = re.compile(r'01[0-9]{9}')
+ROLL_PATTERN = re.compile(r'[0-9]{6}')
+
+NUMPY_MIN_ROWS = 1024  # below this the plain Python range check is faster
+
+
+class ValidationError(ValueError):
+    def __init__(self, codes):
+        self.codes = codes
+        super().__init__("; ".join(MESSAGES[code] for code in codes))
+
+
+def numpy():
+    # Imported on first large batch only, so short CLI runs don't pay for it
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+def clean_input(row):
+    # Normalise raw values the way the prompts do: text, stripped, lower-case email.
+    # "5th" is accepted as well as "5" for the semester.
+    values = {field: str(row.get(field) if row.get(field) is not None else "").strip() for field in FIELDS}
+    values["email"] = values["email"].lower()
+    number = values["semester"][:-2]
+    # Only the ordinal semester_label gives that number: "5th" and "2nd", not "5xy" or "2th"
+    if number.isascii() and number.isdigit() and semester_label(int(number)) == values["semester"].lower():
+        values["semester"] = number
+    return values
+
+
+def out_of_range(numbers, low, high):
+    # numbers holds floats, with None where the text didn't parse (those are never flagged)
+    np = numpy() if len(numbers) >= NUMPY_MIN_ROWS else None
+    if np is not None:
+        values = np.array([low if n is None else n for n in numbers], dtype=float)
+        return ((values < low) | (values > high) | np.isnan(values)).tolist()
+    return [n is not None and not (low <= n <= high) for n in numbers]
+
+
+def text_code(value, prefix):
+    if not value:
+        return f"{prefix}_EMPTY"
+    if LETTERS_PATTERN.fullmatch(value):
+        return None
+    # isdigit() also covers superscripts and the like, which \d and \w disagree on
+    if any(char.isdigit() for char in value):
+        return f"{prefix}_DIGITS"
+    if not all(char.isalpha() or char.isspace() for char in value):
+        return f"{prefix}_CHARS"
+    return None
+
+
+def text_codes(values, prefix):
+    # Depts (and many names) repeat heavily, so each distinct value is checked once
+    seen = {}
+    codes = []
+    for value in values:
+        if value not in seen:
+            seen[value] = text_code(value, prefix)
+        codes.append(seen[value])
+    return codes
+
+
+def to_int(value):
+    # isdigit() also accepts characters like superscripts that int() rejects
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def roll_codes(values):
+    codes = []
+    numbers = []
+    for value in values:
+        number = None
+        if not value:
+            codes.append("ROLL_EMPTY")
+        elif ROLL_PATTERN.fullmatch(value):
+            codes.append(None)
+            number = int(value)
+        elif not value.isdigit():
+            codes.append("ROLL_NOT_NUMERIC")
+        elif len(value) != 6:
+            codes.append("ROLL_LENGTH")
+        else:
+            number = to_int(value)
+            codes.append(None if number is not None else "ROLL_NOT_NUMERIC")
+        numbers.append(number)
+    for i, bad in enumerate(out_of_range(numbers, 1, 999999)):
+        if bad:
+            codes[i] = "ROLL_NOT_POSITIVE"
+    return codes
+
+
+def email_codes(values):
+    codes = []
+    for value in values:
+        if not value:
+            codes.append("EMAIL_EMPTY")
+        elif EMAIL_PATTERN.match(value):
+            codes.append(None)
+        else:
+            codes.append("EMAIL_FORMAT")
+    return codes
+
+
+def cgpa_codes(values):
+    codes = []
+    numbers = []
+    for value in values:
+        number = None
+        if not value:
+            codes.append("CGPA_EMPTY")
+        else:
+            try:
+                number = float(value)
+                codes.append(None)
+            except ValueError:
+                codes.append("CGPA_NOT_NUMBER")
+        numbers.append(number)
+    for i, bad in enumerate(out_of_range(numbers, 0.0, 4.0)):
+        if bad:
+            codes[i] = "CGPA_RANGE"
+    return codes
+
+
+def phone_codes(values):
+    codes = []
+    for value in values:
+        if PHONE_PATTERN.fullmatch(value):
+            codes.append(None)
+        elif not value:
+            codes.append("PHONE_EMPTY")
+        elif not value.isdigit():
+            codes.append("PHONE_NOT_NUMERIC")
+        elif len(value) != 11:
+            codes.append("PHONE_LENGTH")
+        elif not value.startswith("01"):
+            codes.append("PHONE_PREFIX")
+        else:
+            codes.append(None)
+    return codes
+
+
+def semester_codes(values):
+    codes = []
+    numbers = []
+    for value in values:
+        number = None
+        if not value:
+            codes.append("SEMESTER_EMPTY")
+        else:
+            number = to_int(value) if value.isdigit() else None
+            codes.append(None if number is not None else "SEMESTER_NOT_NUMERIC")
+        numbers.append(number)
+    for i, bad in enumerate(out_of_range(numbers, 1, 8)):
+        if bad:
+            codes[i] = "SEMESTER_RANGE"
+    return codes
+
+
+COLUMN_CHECKS = {
+    "name": lambda values: text_codes(values, "NAME"),
+    "roll": roll_codes,
+    "dept": lambda values: text_codes(values, "DEPT"),
+    "email": email_codes,
+    "cgpa": cgpa_codes,
+    "phone": phone_codes,
+    "semester": semester_codes,
+}
+
+
+def validate_columns(columns: dict, existing_rolls=(), existing_emails=()) -> list:
+    # columns maps field name -> list of strings, all the same length; any subset
+    # of FIELDS may be given. Returns one list of error codes per row ([] = valid).
+    # A row's roll/email is only claimed if the row is otherwise valid, so a later
+    # row reusing it is flagged as a duplicate only when an accepted row owns it.
+    count = len(next(iter(columns.values()), []))
+    errors = [[] for _ in range(count)]
+    for field in FIELDS:
+        if field in columns:
+            for row, code in enumerate(COLUMN_CHECKS[field](columns[field])):
+                if code:
+                    errors[row].append(code)
+
+    rolls = columns.get("roll")
+    emails = columns.get("email")
+    seen_rolls, seen_emails = set(), set()
+    for row, row_errors in enumerate(errors):
+        roll = email = None
+        if rolls is not None and not any(c.startswith("ROLL") for c in row_errors):
+            roll = int(rolls[row])
+            if roll in existing_rolls or roll in seen_rolls:
+                row_errors.append("ROLL_EXISTS")
+        if emails is not None and not any(c.startswith("EMAIL") for c in row_errors):
+            email = emails[row].lower()
+            if email in existing_emails or email in seen_emails:
+                row_errors.append("EMAIL_EXISTS")
+        if not row_errors:
+            if roll is not None:
+                seen_rolls.add(roll)
+            if email is not None:
+                seen_emails.add(email)
+    return errors
+
+
+def first_error(field: str, value: str, **existing) -> str | None:
+    codes = validate_columns({field: [value]}, **existing)[0]
+    return MESSAGES[codes[0]] if codes else None
+
+def report(error: str | None) -> bool:
+    if error:
+        print(f"Error: {error}")
         return False
     return True
 
+def validate_name(name: str) -> bool:
+    return report(first_error("name", name))
+
+def validate_roll(sroll: str, roll_index: dict) -> bool:
+    return report(first_error("roll", sroll, existing_rolls=roll_index))
+
 def validate_dept(dept: str) -> bool:
-    if not dept:
-        print("Error: Dept. cannot be empty!")
-        return False
-    if any(char.isdigit() for char in dept):
-        print("Error: Dept cannot contain numbers!")
-        return False
-    if not all(char.isalpha() or char.isspace() for char in dept):
-        print("Error: Dept can contain only letters and spaces!")
-        return False
-    return True
+    return report(first_error("dept", dept))
 
 def validate_email(email: str) -> bool:
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    if not email:
-        print("Error: Email cannot be empty!")
-        return False
-    if not re.match(pattern, email):
-        print("Error: Invalid email format! (Example: name@domain.com)")
-        return False
-    return True
+    return report(first_error("email", email))
 
 def validate_cgpa(cgpa: str) -> bool:
-    if not cgpa:
-        print("Error: CGPA is needed!")
-        return False
-    try:
-        cgpa_float = float(cgpa)
-        if 0.0 <= cgpa_float <= 4.0:
-            return True
-        print("Error: CGPA must be between 0.0 and 4.0!")
-        return False
-    except ValueError:
-        print("Error: CGPA must be a number!")
-        return False
+    return report(first_error("cgpa", cgpa))
 
 def validate_phone(phone: str) -> bool:
-    if not phone:
-        print("Error: Phone cannot be empty!")
-        return False
-    if not phone.isdigit():
-        print("Error: Phone must be numeric!")
-        return False
-    if len(phone) != 11:
-        print("Error: Phone must be 11 digits!")
-        return False
-    if not phone.startswith("01"):
-        print("Error: Phone must start with 01!")
-        return False
-    return True
+    return report(first_error("phone", phone))
 
-def validate_semester(semester: str) -> str | None:
-    if not semester:
-        print("Error: Semester cannot be empty!")
-        return None
-    if not semester.isdigit():
-        print("Error: Semester must be numeric!")
-        return None
-    sem_int = int(semester)
-    if not (1 <= sem_int <= 8):
-        print("Error: Semester must be between 1 and 8!")
+def validate_semester(semester: str) -> int | None:
+    if not report(first_error("semester", semester)):
         return None
-    suffix = {1: "st", 2: "nd", 3: "rd"}
-    return f"{sem_int}{suffix.get(sem_int, 'th')}"
+    return int(semester)